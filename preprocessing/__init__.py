@@ -10,19 +10,24 @@ This module provides tools for preprocessing websites before analysis:
 
 from .models import ScrapingConfig, ScrapingResult, SSLInfo, BotProtectionInfo
 from .scraper import SiteScraper
-from .tools import scrape_websites, check_ssl_certificates, load_urls_from_file, AVAILABLE_TOOLS
+from .tools import (
+    scrape_websites, scrape_websites_stream, materialize_results, close_shared_browser,
+    check_ssl_certificates, load_urls_from_file, AVAILABLE_TOOLS
+)
 
 # Agno tools (optional import - only if agno is available or for future use)
 try:
     from .agno_tools import AGNO_TOOLS, TOOL_METADATA, AGNO_AVAILABLE
     __all__ = [
         'SiteScraper', 'ScrapingConfig', 'ScrapingResult', 'SSLInfo', 'BotProtectionInfo',
-        'scrape_websites', 'check_ssl_certificates', 'load_urls_from_file', 'AVAILABLE_TOOLS',
+        'scrape_websites', 'scrape_websites_stream', 'materialize_results', 'close_shared_browser',
+        'check_ssl_certificates', 'load_urls_from_file', 'AVAILABLE_TOOLS',
         'AGNO_TOOLS', 'TOOL_METADATA', 'AGNO_AVAILABLE'
     ]
 except ImportError as e:
     # agno_tools.py import failed (shouldn't happen since we don't require agno)
     __all__ = [
         'SiteScraper', 'ScrapingConfig', 'ScrapingResult', 'SSLInfo', 'BotProtectionInfo',
-        'scrape_websites', 'check_ssl_certificates', 'load_urls_from_file', 'AVAILABLE_TOOLS'
+        'scrape_websites', 'scrape_websites_stream', 'materialize_results', 'close_shared_browser',
+        'check_ssl_certificates', 'load_urls_from_file', 'AVAILABLE_TOOLS'
     ]
\ No newline at end of file
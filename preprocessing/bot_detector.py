@@ -13,6 +13,17 @@ from .models import BotProtectionInfo
 
 __all__ = ['BotDetector']
 
+_META_REFRESH_RE = re.compile(r'<meta[^>]*http-equiv=["\']?refresh["\']?')
+_META_REFRESH_BYTES_RE = re.compile(_META_REFRESH_RE.pattern.encode())
+
+# Interstitial/challenge markers that identify a whole page as a block page.
+# Plain "cloudflare" is deliberately absent: many normal sites load cdnjs.cloudflare.com.
+_BLOCK_PAGE_RE = re.compile(
+    r'attention required! \| cloudflare|<title>just a moment\.\.\.</title>|cf-chl-|ddos-guard',
+    re.IGNORECASE,
+)
+_BLOCK_PAGE_WINDOW = 8192
+
 
 class BotDetector:
     """Bot protection detection and analysis."""
@@ -49,6 +60,79 @@ class BotDetector:
         "verification required", "challenge",
     ]
     
+    # Indicator/label pairs, lowercased and formatted once rather than per page
+    _HTML_INDICATOR_LABELS = tuple(
+        (indicator, f"{prefix}_{indicator.replace(' ', '_')}")
+        for prefix, group in (
+            ("cloudflare", CLOUDFLARE_INDICATORS),
+            ("ddos_guard", DDOS_GUARD_INDICATORS),
+            ("recaptcha", RECAPTCHA_INDICATORS),
+            ("rate_limit", RATE_LIMIT_INDICATORS),
+            ("generic", GENERIC_BOT_INDICATORS),
+        )
+        for indicator in group
+    )
+    
+    _ERROR_PHRASE_LABELS = tuple(
+        (phrase, f"error_message_{phrase.replace(' ', '_')}")
+        for phrase in BOT_PROTECTION_ERROR_PHRASES
+    )
+    
+    # Anchor tokens: every HTML indicator (plus the challenge and meta refresh
+    # checks) contains at least one of these, so a page matching none of them
+    # cannot produce any indicator and the full scan can be skipped.
+    _FAST_PROBE = frozenset({
+        "cloudflare", "cf-", "checking your browser", "attention required", "ray id:",
+        "ddos", "recaptcha", "not a robot", "human", "rate limit", "too many requests",
+        "requests per minute", "try again later", "temporary block", "bot protection",
+        "automated traffic", "suspicious activity", "access denied", "forbidden",
+        "verification", "challenge", "refresh",
+    })
+    
+    # Byte-string copies for matching encoded HTML without decoding it
+    _HTML_INDICATOR_LABELS_BYTES = tuple(
+        (indicator.encode(), label) for indicator, label in _HTML_INDICATOR_LABELS
+    )
+    _FAST_PROBE_BYTES = frozenset(token.encode() for token in _FAST_PROBE)
+    
+    # HTTP statuses that bot protection services answer with instead of the page
+    BLOCK_PAGE_STATUSES = frozenset({403, 429, 503})
+    
+    @classmethod
+    def is_block_page(cls, html_content: str, status: Optional[int] = None) -> bool:
+        """
+        Cheap check for responses that are clearly a challenge or block page.
+        
+        Only the first few KB of HTML are inspected, so this is suitable for
+        deciding whether expensive follow-up work (e.g. screenshots) is worthwhile.
+        
+        Args:
+            html_content: The HTML content of the page
+            status: Optional HTTP status code of the main response
+            
+        Returns:
+            True if the response looks like a bot protection block page
+        """
+        if status in cls.BLOCK_PAGE_STATUSES:
+            return True
+        return bool(html_content) and _BLOCK_PAGE_RE.search(html_content[:_BLOCK_PAGE_WINDOW]) is not None
+    
+    @classmethod
+    def mark_block_page(cls, bot_info: BotProtectionInfo) -> BotProtectionInfo:
+        """
+        Fold an is_block_page() hit into existing detection results.
+        
+        Args:
+            bot_info: Detection results for the page's HTML
+            
+        Returns:
+            bot_info if it already reports protection, otherwise a result
+            re-scored with a block page indicator added
+        """
+        if bot_info.detected:
+            return bot_info
+        return cls._build_protection_info(bot_info.indicators + ["blocked_page"], None)
+    
     @classmethod
     def detect_protection(cls, html_content: str, error_message: Optional[str] = None) -> BotProtectionInfo:
         """
@@ -67,6 +151,37 @@ class BotDetector:
         if html_content:
             indicators.extend(cls._analyze_html_content(html_content))
         
+        return cls._build_protection_info(indicators, error_message)
+    
+    @classmethod
+    def detect_protection_bytes(cls, html_bytes: bytes,
+                                error_message: Optional[str] = None) -> BotProtectionInfo:
+        """
+        Detect bot protection measures in UTF-8 encoded HTML.
+        
+        Equivalent to detect_protection(), but matches the (ASCII) indicators
+        against the raw bytes, so callers that already hold the encoded page
+        skip a second pass over it as a Python string.
+        
+        Args:
+            html_bytes: The UTF-8 encoded HTML content of the page to analyze
+            error_message: Optional error message from failed requests
+            
+        Returns:
+            BotProtectionInfo object with detection results and confidence score
+        """
+        indicators = []
+        
+        # Analyze HTML content
+        if html_bytes:
+            indicators.extend(cls._analyze_html_bytes(html_bytes))
+        
+        return cls._build_protection_info(indicators, error_message)
+    
+    @classmethod
+    def _build_protection_info(cls, indicators: List[str],
+                               error_message: Optional[str]) -> BotProtectionInfo:
+        """Add error message indicators and score the combined evidence."""
         # Analyze error messages
         if error_message:
             indicators.extend(cls._analyze_error_message(error_message))
@@ -91,37 +206,47 @@ class BotDetector:
         indicators = []
         html_lower = html_content.lower()
         
-        # Check for Cloudflare indicators
-        for indicator in cls.CLOUDFLARE_INDICATORS:
-            if indicator in html_lower:
-                indicators.append(f"cloudflare_{indicator.replace(' ', '_')}")
+        # Most pages carry no protection markers at all; bail out early
+        if not any(token in html_lower for token in cls._FAST_PROBE):
+            return indicators
         
-        # Check for DDoS Guard indicators  
-        for indicator in cls.DDOS_GUARD_INDICATORS:
+        # Check for Cloudflare, DDoS Guard, reCAPTCHA, rate limit and generic indicators
+        for indicator, label in cls._HTML_INDICATOR_LABELS:
             if indicator in html_lower:
-                indicators.append(f"ddos_guard_{indicator.replace(' ', '_')}")
+                indicators.append(label)
         
-        # Check for reCAPTCHA indicators
-        for indicator in cls.RECAPTCHA_INDICATORS:
-            if indicator in html_lower:
-                indicators.append(f"recaptcha_{indicator.replace(' ', '_')}")
+        # Check for JavaScript challenges
+        if "challenge" in html_lower and ("javascript" in html_lower or "js" in html_lower):
+            indicators.append("javascript_challenge")
         
-        # Check for rate limit indicators
-        for indicator in cls.RATE_LIMIT_INDICATORS:
-            if indicator in html_lower:
-                indicators.append(f"rate_limit_{indicator.replace(' ', '_')}")
+        # Check for meta refresh redirects (common in challenges)
+        if "refresh" in html_lower and _META_REFRESH_RE.search(html_lower):
+            indicators.append("meta_refresh_redirect")
         
-        # Check for generic bot protection
-        for indicator in cls.GENERIC_BOT_INDICATORS:
+        return indicators
+    
+    @classmethod
+    def _analyze_html_bytes(cls, html_bytes: bytes) -> List[str]:
+        """Analyze encoded HTML content for bot protection indicators."""
+        indicators = []
+        # bytes.lower() only folds ASCII, which is all the indicators contain
+        html_lower = html_bytes.lower()
+        
+        # Most pages carry no protection markers at all; bail out early
+        if not any(token in html_lower for token in cls._FAST_PROBE_BYTES):
+            return indicators
+        
+        # Check for Cloudflare, DDoS Guard, reCAPTCHA, rate limit and generic indicators
+        for indicator, label in cls._HTML_INDICATOR_LABELS_BYTES:
             if indicator in html_lower:
-                indicators.append(f"generic_{indicator.replace(' ', '_')}")
+                indicators.append(label)
         
         # Check for JavaScript challenges
-        if "challenge" in html_lower and ("javascript" in html_lower or "js" in html_lower):
+        if b"challenge" in html_lower and (b"javascript" in html_lower or b"js" in html_lower):
             indicators.append("javascript_challenge")
         
         # Check for meta refresh redirects (common in challenges)
-        if re.search(r'<meta[^>]*http-equiv=["\']?refresh["\']?', html_lower):
+        if b"refresh" in html_lower and _META_REFRESH_BYTES_RE.search(html_lower):
             indicators.append("meta_refresh_redirect")
         
         return indicators
@@ -141,9 +266,9 @@ class BotDetector:
             indicators.append("http_503_service_unavailable")
         
         # Common bot protection error phrases
-        for phrase in cls.BOT_PROTECTION_ERROR_PHRASES:
+        for phrase, label in cls._ERROR_PHRASE_LABELS:
             if phrase in error_lower:
-                indicators.append(f"error_message_{phrase.replace(' ', '_')}")
+                indicators.append(label)
         
         return indicators
     
@@ -8,6 +8,7 @@ Handles URL input, configuration, and output management.
 
 import argparse
 import asyncio
+import logging
 import uuid
 from pathlib import Path
 from typing import List
@@ -35,6 +36,9 @@ Examples:
   
   # Adjust viewport and concurrency
   python -m preprocessing.cli --urls-file urls.txt --viewport 1366x768 --max-concurrent 3
+  
+  # HTML only, without downloading images, video or fonts
+  python -m preprocessing.cli --urls-file urls.txt --no-screenshot --block-resources image,media,font
         """
     )
     
@@ -55,15 +59,40 @@ Examples:
                        help='Browser viewport size as WIDTHxHEIGHT (default: 1920x1080)')
     parser.add_argument('--timeout', type=int, default=30000,
                        help='Page load timeout in milliseconds (default: 30000)')
+    parser.add_argument('--wait-until', default='domcontentloaded',
+                       choices=['commit', 'domcontentloaded', 'load', 'networkidle'],
+                       help='Navigation event to wait for (default: domcontentloaded)')
+    parser.add_argument('--settle-ms', type=int, default=5000,
+                       help='Extra time to wait for the load event after navigation (default: 5000)')
     parser.add_argument('--max-concurrent', type=int, default=5,
                        help='Maximum concurrent scraping tasks (default: 5)')
+    parser.add_argument('--max-per-host', type=int, default=2,
+                       help='Maximum concurrent tasks against one host (default: 2)')
     parser.add_argument('--user-agent', 
                        default="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
                        help='Browser user agent string')
+    parser.add_argument('--block-resources', default='',
+                       help='Comma-separated resource types to block, e.g. image,media,font (default: none)')
+    parser.add_argument('--skip-assets', action='store_true',
+                       help='Block assets the output does not need (images/CSS too with --no-screenshot)')
+    parser.add_argument('--no-screenshot', action='store_true',
+                       help='Capture HTML only and skip screenshots')
+    parser.add_argument('--viewport-only', action='store_true',
+                       help='Screenshot the visible viewport instead of the full page')
+    parser.add_argument('--screenshot-format', choices=['png', 'jpeg'], default='png',
+                       help='Screenshot image format (default: png)')
+    parser.add_argument('--screenshot-quality', type=int, default=80,
+                       help='JPEG quality 0-100 (default: 80, ignored for png)')
+    parser.add_argument('--parse-processes', type=int, default=0,
+                       help='Worker processes for HTML analysis (default: 0, analyse in threads)')
+    parser.add_argument('--compress-html', action='store_true',
+                       help='Store HTML as zstd-compressed .html.zst files instead of plain .html')
     
     # Output format options  
     parser.add_argument('--output-file',
                        help='Custom output file name for results JSON')
+    parser.add_argument('--quiet', action='store_true',
+                       help='Only log warnings and errors (skips per-URL progress logs on large runs)')
     
     args = parser.parse_args()
     
@@ -73,7 +102,11 @@ Examples:
             structlog.processors.TimeStamper(fmt="ISO"),
             structlog.dev.ConsoleRenderer()
         ],
-        wrapper_class=structlog.make_filtering_bound_logger(20),
+        # Filtered calls return immediately, so --quiet also skips formatting
+        # and writing every per-URL event
+        wrapper_class=structlog.make_filtering_bound_logger(
+            logging.WARNING if args.quiet else logging.INFO
+        ),
         logger_factory=structlog.PrintLoggerFactory(),
         cache_logger_on_first_use=True,
     )
@@ -115,7 +148,17 @@ Examples:
             viewport_height=viewport_height,
             timeout_ms=args.timeout,
             max_concurrent=args.max_concurrent,
-            user_agent=args.user_agent
+            max_per_host=args.max_per_host,
+            user_agent=args.user_agent,
+            block_resources={r.strip() for r in args.block_resources.split(',') if r.strip()},
+            skip_assets=args.skip_assets,
+            screenshot_mode='none' if args.no_screenshot else ('viewport' if args.viewport_only else 'full_page'),
+            screenshot_format=args.screenshot_format,
+            screenshot_quality=args.screenshot_quality,
+            wait_until=args.wait_until,
+            settle_ms=args.settle_ms,
+            compress_html=args.compress_html,
+            parse_processes=args.parse_processes
         )
         
         logger.info("starting_scraping_job",
@@ -133,7 +176,7 @@ Examples:
             if args.output_file:
                 output_file = args.output_dir / args.output_file
             
-            results_path = scraper.save_results_json(output_file)
+            results_path = await asyncio.to_thread(scraper.save_results_json, output_file)
             
             # Print summary
             success_count = sum(1 for r in results if r.status == "success")
@@ -6,8 +6,11 @@ Extracts useful information from HTML content including company names,
 metadata, and other structured data.
 """
 
+import functools
 import hashlib
+import io
 import re
+from html import unescape
 from typing import List, Optional, Dict, Any
 from urllib.parse import urlparse
 
@@ -17,13 +20,41 @@ logger = structlog.get_logger()
 
 __all__ = ['ContentExtractor']
 
+# Company names live in the document head, so the regex fast path only scans this much
+_FAST_PATH_WINDOW = 65536
+
+_META_TAG_RE = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+_OG_SITE_NAME_RE = re.compile(r'(?<![\w-])property\s*=\s*["\']?og:site_name(?=["\'\s/>])', re.IGNORECASE)
+_CONTENT_ATTR_RE = re.compile(r'(?<![\w-])content\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))', re.IGNORECASE)
+_TITLE_RE = re.compile(r'<title\b[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+_H1_RE = re.compile(r'<h1\b[^>]*>(.*?)</h1\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Trailing " - Home" / " | Official Site" style suffixes (possibly stacked)
+_TITLE_SUFFIX_RE = re.compile(r'(?:\s+[-|]\s+(?:Home|Official\s+Site))+\s*$', re.IGNORECASE)
+# Leading "www." and a trailing ".com" / ".co.uk" (before any port)
+_DOMAIN_AFFIX_RE = re.compile(r'^www\.|\.(?:com|co\.uk)(?=(?::\d+)?$)')
+
+
+@functools.lru_cache(maxsize=1)
+def _dct_matrix():
+    """First 8 rows of the orthonormal 32-point DCT-II matrix used by pHash."""
+    import numpy as np
+    
+    n = np.arange(32)
+    k = np.arange(8)[:, None]
+    matrix = np.sqrt(2 / 32) * np.cos(np.pi * (2 * n + 1) * k / (2 * 32))
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
 
 class ContentExtractor:
     """HTML content extraction and analysis utilities."""
     
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def extract_domain(url: str) -> str:
-        """Extract domain from URL."""
+        """Extract domain from URL (cached, as the same URLs are looked up repeatedly)."""
         try:
             parsed = urlparse(url)
             return parsed.netloc.lower()
@@ -43,32 +74,32 @@ class ContentExtractor:
             Extracted company name or domain-based fallback
         """
         try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Cheap regex pass over the document head; only parse on a miss
+            for candidate in ContentExtractor._fast_company_name_candidates(html_content):
+                if len(candidate) > 2:
+                    return candidate
             
             # Try multiple methods to get company name
             candidates = []
             
-            # 1. OpenGraph site name
-            og_site = soup.find('meta', property='og:site_name')
-            if og_site and og_site.get('content'):
-                candidates.append(og_site.get('content').strip())
-            
-            # 2. Title tag (clean up common patterns)
-            title = soup.find('title')
-            if title:
-                title_text = title.get_text().strip()
-                # Remove common suffixes
-                for suffix in [' - Home', ' | Home', ' - Official Site', ' | Official Site']:
-                    if title_text.endswith(suffix):
-                        title_text = title_text[:-len(suffix)].strip()
+            if html_content.strip():
+                from lxml import html as lxml_html
+                # A fresh parser per call keeps this safe to run from worker threads
+                parser = lxml_html.HTMLParser(encoding='utf-8')
+                root = lxml_html.fromstring(html_content.encode('utf-8'), parser=parser)
+                
+                # 1. OpenGraph site name
+                og_site = root.xpath('string((//meta[@property="og:site_name"])[1]/@content)').strip()
+                if og_site:
+                    candidates.append(og_site)
+                
+                # 2. Title tag (clean up common patterns)
+                title_text = ContentExtractor._clean_title(root.xpath('string((//title)[1])'))
                 if title_text and len(title_text) < 100:
                     candidates.append(title_text)
-            
-            # 3. First h1 tag
-            h1 = soup.find('h1')
-            if h1:
-                h1_text = h1.get_text().strip()
+                
+                # 3. First h1 tag
+                h1_text = root.xpath('string((//h1)[1])').strip()
                 if h1_text and len(h1_text) < 100:
                     candidates.append(h1_text)
             
@@ -78,12 +109,57 @@ class ContentExtractor:
                     return candidate.strip()
             
             # Fallback to domain-based name
-            domain = ContentExtractor.extract_domain(url)
-            return domain.replace('www.', '').replace('.com', '').replace('.co.uk', '').title()
+            return ContentExtractor._domain_company_name(url)
             
         except Exception as e:
             logger.warning("company_name_extraction_failed", url=url, error=str(e))
-            return ContentExtractor.extract_domain(url)
+            return ContentExtractor._domain_company_name(url)
+    
+    @staticmethod
+    def _domain_company_name(url: str) -> str:
+        """Title-case the domain without a leading www. or trailing .com/.co.uk."""
+        return _DOMAIN_AFFIX_RE.sub('', ContentExtractor.extract_domain(url)).title()
+    
+    @staticmethod
+    def _clean_title(title_text: str) -> str:
+        """Strip whitespace and common "Home"/"Official Site" suffixes from a title."""
+        return _TITLE_SUFFIX_RE.sub('', title_text.strip())
+    
+    @staticmethod
+    def _fast_company_name_candidates(html_content: str) -> List[str]:
+        """
+        Collect company name candidates with precompiled regexes.
+        
+        Mirrors the og:site_name / title / h1 order used by the parser-based
+        path, but only looks at the first _FAST_PATH_WINDOW characters.
+        """
+        head = html_content[:_FAST_PATH_WINDOW]
+        candidates = []
+        
+        for meta_match in _META_TAG_RE.finditer(head):
+            meta_tag = meta_match.group(0)
+            if _OG_SITE_NAME_RE.search(meta_tag):
+                content_match = _CONTENT_ATTR_RE.search(meta_tag)
+                if content_match:
+                    content = next(g for g in content_match.groups() if g is not None)
+                    content = unescape(content).strip()
+                    if content:
+                        candidates.append(content)
+                break
+        
+        title_match = _TITLE_RE.search(head)
+        if title_match:
+            title_text = ContentExtractor._clean_title(unescape(title_match.group(1)))
+            if title_text and len(title_text) < 100:
+                candidates.append(title_text)
+        
+        h1_match = _H1_RE.search(head)
+        if h1_match:
+            h1_text = unescape(_TAG_RE.sub('', h1_match.group(1))).strip()
+            if h1_text and len(h1_text) < 100:
+                candidates.append(h1_text)
+        
+        return candidates
     
     @staticmethod
     def extract_metadata(html_content: str) -> Dict[str, Any]:
@@ -228,6 +304,56 @@ class ContentExtractor:
         """
         return hashlib.sha256(screenshot_data).hexdigest()
     
+    @staticmethod
+    def calculate_perceptual_hash(screenshot_data: bytes) -> Optional[str]:
+        """
+        Calculate a 64-bit perceptual hash (pHash) of a screenshot.
+        
+        Unlike the SHA-256 hash, visually similar screenshots produce hashes
+        a small Hamming distance apart, so near-duplicates can be matched.
+        
+        Args:
+            screenshot_data: Binary screenshot data (PNG or JPEG)
+            
+        Returns:
+            16-character hexadecimal hash string, or None if the image can't be decoded
+        """
+        try:
+            import numpy as np
+            from PIL import Image
+            
+            with Image.open(io.BytesIO(screenshot_data)) as image:
+                # Let the JPEG decoder downscale while decoding (no-op for PNG)
+                image.draft('L', (64, 64))
+                pixels = np.asarray(
+                    image.convert('L').resize((32, 32), Image.Resampling.BOX),
+                    dtype=np.float64
+                )
+            
+            # Low-frequency 8x8 corner of the 2D DCT, thresholded against its median
+            dct = _dct_matrix()
+            block = dct @ pixels @ dct.T
+            bits = block > np.median(block)
+            return np.packbits(bits).tobytes().hex()
+            
+        except Exception as e:
+            logger.warning("perceptual_hash_failed", error=str(e))
+            return None
+    
+    @staticmethod
+    def hamming_distance(hash_a: str, hash_b: str) -> int:
+        """
+        Count the differing bits between two perceptual hashes.
+        
+        Args:
+            hash_a: Hexadecimal hash from calculate_perceptual_hash
+            hash_b: Hexadecimal hash from calculate_perceptual_hash
+            
+        Returns:
+            Number of differing bits (0 means identical; <= 2 is a near-duplicate)
+        """
+        return (int(hash_a, 16) ^ int(hash_b, 16)).bit_count()
+    
     @staticmethod
     def get_content_summary(html_content: str) -> Dict[str, Any]:
         """
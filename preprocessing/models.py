@@ -8,7 +8,7 @@ Contains all dataclass definitions used throughout the scraping process.
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 __all__ = ['ScrapingConfig', 'SSLInfo', 'BotProtectionInfo', 'ScrapingResult']
 
@@ -22,12 +22,33 @@ class ScrapingConfig:
     viewport_height: int = 1080
     timeout_ms: int = 30000
     max_concurrent: int = 5
+    max_per_host: int = 2  # Concurrent navigations allowed against a single host
+    max_pages_per_context: int = 50  # Recycle a browser context after this many pages
     user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    block_resources: Set[str] = None  # Playwright resource types to abort, e.g. {"image", "media", "font"}
+    skip_assets: bool = False  # Also block assets the output doesn't need (depends on screenshot_mode)
+    screenshot_mode: str = "full_page"  # "full_page", "viewport" or "none"
+    screenshot_format: str = "png"  # "png" or "jpeg"
+    screenshot_quality: int = 80  # JPEG quality (ignored for PNG)
+    wait_until: str = "domcontentloaded"  # Playwright goto() wait condition
+    settle_ms: int = 5000  # Extra wait for the load event after navigation (0 to disable)
+    compress_html: bool = False  # Store HTML as zstd-compressed .html.zst files instead of plain .html
+    parse_processes: int = 0  # >0 runs HTML analysis in a process pool of this size
     
     def __post_init__(self):
-        """Ensure output directory exists."""
+        """Ensure output directory exists and fill in defaults."""
         self.output_dir = Path(self.output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        if self.block_resources is None:
+            self.block_resources = set()
+        else:
+            self.block_resources = set(self.block_resources)
+        
+        if self.screenshot_mode not in ("full_page", "viewport", "none"):
+            raise ValueError(f"Unknown screenshot_mode: {self.screenshot_mode}")
+        if self.screenshot_format not in ("png", "jpeg"):
+            raise ValueError(f"Unknown screenshot_format: {self.screenshot_format}")
 
 
 @dataclass
@@ -76,8 +97,23 @@ class ScrapingResult:
     status: str  # success, timeout, error
     error_message: Optional[str] = None
     timestamp: str = None
+    screenshot_phash: Optional[str] = None  # 64-bit perceptual hash (hex) for near-duplicate matching
     
     def __post_init__(self):
         """Set timestamp if not provided."""
         if self.timestamp is None:
-            self.timestamp = datetime.now().isoformat()
\ No newline at end of file
+            self.timestamp = datetime.now().isoformat()
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ScrapingResult':
+        """
+        Rebuild a result from its JSON form (as written by save_results_json).
+        
+        Raises:
+            TypeError, KeyError: If data doesn't match the current schema
+        """
+        return cls(**{
+            **data,
+            'ssl_info': SSLInfo(**data['ssl_info']),
+            'bot_protection': BotProtectionInfo(**data['bot_protection']),
+        })
\ No newline at end of file
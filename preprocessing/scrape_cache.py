@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Scrape Result Cache
+
+Persists successful scraping results in SQLite so repeated runs over the same
+URLs can skip the browser entirely while the cached results are fresh.
+"""
+
+import hashlib
+import sqlite3
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+import structlog
+
+from .models import ScrapingConfig, ScrapingResult
+
+logger = structlog.get_logger()
+
+__all__ = ['ScrapeCache']
+
+
+class ScrapeCache:
+    """SQLite-backed cache of successful scraping results."""
+    
+    FILENAME = "cache.sqlite"
+    
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / self.FILENAME
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS scrape_cache ("
+            "url_hash TEXT PRIMARY KEY, result_json BLOB NOT NULL, "
+            "screenshot_path TEXT, ts INTEGER NOT NULL)"
+        )
+        self._db.commit()
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
+    
+    @staticmethod
+    def cache_key(url: str, config: ScrapingConfig) -> str:
+        """
+        Key a URL by the settings that change what a scrape captures.
+        
+        Args:
+            url: The URL as given to the scraper
+            config: Scraping configuration used for the run
+        
+        Returns:
+            Hexadecimal SHA-256 key
+        """
+        parts = (
+            url, f"{config.viewport_width}x{config.viewport_height}", config.user_agent,
+            config.screenshot_mode, config.screenshot_format, str(config.screenshot_quality),
+            ",".join(sorted(config.block_resources)), str(config.skip_assets),
+            config.wait_until, str(config.settle_ms), str(config.compress_html),
+        )
+        return hashlib.sha256("\x00".join(parts).encode('utf-8')).hexdigest()
+    
+    def get_many(self, urls: Iterable[str], config: ScrapingConfig,
+                 ttl_s: int) -> Dict[str, ScrapingResult]:
+        """
+        Look up fresh cached results.
+        
+        Results whose stored HTML or screenshot file has since been removed
+        are treated as misses.
+        
+        Args:
+            urls: URLs to look up
+            config: Scraping configuration for this run (results are re-tagged
+                with its job_id)
+            ttl_s: Maximum age of a cached result in seconds
+        
+        Returns:
+            Dict mapping each URL with a usable cached result to that result
+        """
+        keys = {self.cache_key(url, config): url for url in urls}
+        cutoff = int(time.time()) - ttl_s
+        hits: Dict[str, ScrapingResult] = {}
+        
+        key_list = list(keys)
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(key_list), 500):
+            chunk = key_list[start:start + 500]
+            rows = self._db.execute(
+                f"SELECT url_hash, result_json FROM scrape_cache "
+                f"WHERE ts >= ? AND url_hash IN ({','.join('?' * len(chunk))})",
+                (cutoff, *chunk)
+            ).fetchall()
+            for url_hash, result_json in rows:
+                result = self._decode(result_json)
+                if result is None or not self._files_exist(result):
+                    continue
+                hits[keys[url_hash]] = replace(result, job_id=config.job_id)
+        
+        logger.info("scrape_cache_lookup", requested=len(keys), hits=len(hits))
+        return hits
+    
+    def put_many(self, results: Iterable[ScrapingResult], config: ScrapingConfig) -> None:
+        """
+        Store successful results; timeouts and errors are never cached.
+        
+        Args:
+            results: Results from a scraping run
+            config: Scraping configuration used for the run
+        """
+        now = int(time.time())
+        rows: List[Tuple[str, bytes, Optional[str], int]] = [
+            (self.cache_key(result.original_url, config), orjson.dumps(result),
+             result.screenshot_path, now)
+            for result in results if result.status == "success"
+        ]
+        if rows:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO scrape_cache (url_hash, result_json, screenshot_path, ts) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._db.commit()
+    
+    @staticmethod
+    def _decode(result_json: bytes) -> Optional[ScrapingResult]:
+        """Rebuild a ScrapingResult from its stored JSON, or None if it no longer fits."""
+        try:
+            return ScrapingResult.from_dict(orjson.loads(result_json))
+        except (TypeError, KeyError, orjson.JSONDecodeError) as e:
+            logger.warning("scrape_cache_entry_invalid", error=str(e))
+            return None
+    
+    def _files_exist(self, result: ScrapingResult) -> bool:
+        """Check that the files a cached result points to are still on disk."""
+        return all(
+            (self.output_dir / path).exists()
+            for path in (result.html_path, result.screenshot_path) if path
+        )
@@ -9,16 +9,24 @@ This is the refactored version using modular components.
 """
 
 import asyncio
-import json
+import concurrent.futures
+import hashlib
+import os
+import sqlite3
+import threading
+import time
 import uuid
-from dataclasses import asdict
+from collections import Counter, OrderedDict, defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 from urllib.parse import urlparse
 
+import orjson
 import structlog
+import zstandard
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from .models import ScrapingConfig, ScrapingResult, SSLInfo, BotProtectionInfo
 from .ssl_checker import SSLChecker
@@ -30,14 +38,153 @@ logger = structlog.get_logger()
 __all__ = ['SiteScraper']
 
 
+# Resource types skip_assets blocks: everything non-essential for HTML-only runs,
+# only what barely affects the rendered page when a screenshot is taken
+_HTML_ONLY_SKIPPED_ASSETS = frozenset({"image", "media", "font", "stylesheet"})
+_SCREENSHOT_SKIPPED_ASSETS = frozenset({"media", "font"})
+
+# Hosts remembered for context affinity; older entries fall back to any context
+_MAX_HOST_AFFINITIES = 1024
+
+
+def _available_cpus() -> int:
+    """Number of CPUs this process may run on (respects affinity masks)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+# zstd contexts must not be shared between threads, and _postprocess runs in a
+# worker thread, so each thread keeps its own compressor
+_zstd_local = threading.local()
+
+
+def _zstd_compressor() -> zstandard.ZstdCompressor:
+    """Return this thread's zstd compressor, creating it on first use."""
+    compressor = getattr(_zstd_local, 'compressor', None)
+    if compressor is None:
+        compressor = _zstd_local.compressor = zstandard.ZstdCompressor(level=3)
+    return compressor
+
+
+def _interleave_by_host(urls: List[str]) -> List[int]:
+    """
+    Order URL indices round-robin across hosts.
+    
+    Consecutive tasks then target different hosts, so the per-host limit
+    doesn't leave global slots idle behind a run of same-host URLs.
+    """
+    by_host: Dict[str, List[int]] = {}
+    for i, url in enumerate(urls):
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        by_host.setdefault(ContentExtractor.extract_domain(url), []).append(i)
+    
+    order = []
+    queues = list(by_host.values())
+    depth = 0
+    while queues:
+        queues = [q for q in queues if len(q) > depth]
+        order.extend(q[depth] for q in queues)
+        depth += 1
+    return order
+
+
+class _ContextQueue(asyncio.Queue):
+    """Context pool queue that can also hand out a specific idle context."""
+    
+    def take_nowait(self, item) -> bool:
+        """Remove item from the queue if it is waiting there; return whether it was."""
+        try:
+            self._queue.remove(item)
+        except ValueError:
+            return False
+        return True
+
+
+def _analyze_html(html_content: str, url: str,
+                  html_bytes: Optional[bytes] = None) -> Tuple[BotProtectionInfo, str]:
+    """
+    Bot detection and company name extraction (module-level so it pickles).
+    
+    html_bytes is the UTF-8 encoding of html_content, when the caller already has it.
+    """
+    if html_bytes is None:
+        html_bytes = html_content.encode('utf-8')
+    bot_protection = BotDetector.detect_protection_bytes(html_bytes)
+    company_name = ContentExtractor.extract_company_name(html_content, url)
+    return bot_protection, company_name
+
+
 class SiteScraper:
     """Main scraper class for capturing website screenshots and content."""
     
-    def __init__(self, config: ScrapingConfig):
+    def __init__(self, config: ScrapingConfig, browser: Optional[Browser] = None):
         self.config = config
         self.browser: Optional[Browser] = None
+        # Browser owned by the caller (e.g. kept warm across jobs); start() uses
+        # it instead of launching one and close() leaves it running
+        self._shared_browser = browser
         self.context: Optional[BrowserContext] = None
         self.results: List[ScrapingResult] = []
+        self._viewport_str = f"{config.viewport_width}x{config.viewport_height}"
+        
+        # page.screenshot() arguments and stored file extension, fixed per run
+        self._screenshot_options = {
+            "full_page": config.screenshot_mode == "full_page",
+            "type": config.screenshot_format,
+        }
+        if config.screenshot_format == "jpeg":
+            self._screenshot_options["quality"] = config.screenshot_quality
+        self._screenshot_ext = ".jpg" if config.screenshot_format == "jpeg" else ".png"
+        
+        # Resource types aborted by the context route (empty means no route)
+        self._blocked_resources = frozenset(config.block_resources)
+        if config.skip_assets:
+            skipped = (_HTML_ONLY_SKIPPED_ASSETS if config.screenshot_mode == "none"
+                       else _SCREENSHOT_SKIPPED_ASSETS)
+            self._blocked_resources |= skipped
+        
+        # Navigation is network-bound and capped by max_concurrent; parsing and
+        # hashing are CPU-bound and capped by the cores available to us
+        self._net_semaphore = asyncio.Semaphore(config.max_concurrent)
+        self._cpu_semaphore = asyncio.Semaphore(_available_cpus())
+        # Per-host cap on top of the global one, so a batch dominated by one host
+        # doesn't stampede it into rate limiting or connection resets
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(config.max_per_host)
+        )
+        
+        # Pool of max_concurrent browser contexts, filled in start(); each one is
+        # recycled after max_pages_per_context pages so cookies, storage and
+        # native handles don't accumulate over long batches
+        self._contexts: List[BrowserContext] = []
+        self._context_pool: Optional[asyncio.Queue] = None
+        self._context_pages: Dict[int, int] = {}
+        # Context that last served each host (LRU, capped), so repeat visits can
+        # reuse its open connections and TLS sessions when it is idle
+        self._host_contexts: "OrderedDict[str, BrowserContext]" = OrderedDict()
+        # One parked page per pooled context, navigated to about:blank between scrapes
+        self._idle_pages: Dict[int, Page] = {}
+        
+        # Content-addressed files this scraper has already stored or seen on disk,
+        # so repeated content skips the stat() and any encoding work
+        self._stored_objects: Set[str] = set()
+        # Shard directories known to exist, so new objects skip the mkdir() call
+        self._known_dirs: Set[Path] = set()
+        
+        # Optional process pool for HTML analysis, started in start(); without it
+        # analysis runs in the _postprocess worker thread
+        self._parse_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        
+        # Perceptual hashes keyed by screenshot SHA-256, persisted in the output
+        # directory (opened in start()) so reruns over the same corpus skip pHash
+        self._phash_db: Optional[sqlite3.Connection] = None
+        self._phash_lock = threading.Lock()
+        
+        # Unbuffered JSONL sink, opened in start(); each result is appended as
+        # soon as it completes so partial batches survive a crash
+        self._results_stream = None
         
     async def __aenter__(self):
         await self.start()
@@ -51,24 +198,207 @@ class SiteScraper:
         if self.browser is not None:
             return
             
-        logger.info("starting_browser", job_id=self.config.job_id)
+        if self._shared_browser is not None:
+            self.browser = self._shared_browser
+        else:
+            logger.info("starting_browser", job_id=self.config.job_id)
+            playwright = await async_playwright().start()
+            self.browser = await playwright.chromium.launch(headless=True)
         
-        playwright = await async_playwright().start()
-        self.browser = await playwright.chromium.launch(headless=True)
-        self.context = await self.browser.new_context(
-            viewport={"width": self.config.viewport_width, "height": self.config.viewport_height},
-            user_agent=self.config.user_agent
-        )
+        self._context_pool = _ContextQueue()
+        for _ in range(self.config.max_concurrent):
+            context = await self._new_context()
+            self._contexts.append(context)
+            self._context_pool.put_nowait(context)
+        self.context = self._contexts[0]
+        
+        self._results_stream = open(self.results_stream_path, 'ab', buffering=0)
+        
+        if self.config.parse_processes > 0:
+            self._parse_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.config.parse_processes
+            )
+        
+        if self.config.screenshot_mode != "none":
+            self._open_phash_cache()
     
     async def close(self):
         """Close browser and cleanup."""
-        if self.context:
-            await self.context.close()
-            self.context = None
+        contexts = list(self._contexts)
+        if self.context is not None and self.context not in contexts:
+            contexts.append(self.context)
+        for context in contexts:
+            await context.close()
+        self._contexts = []
+        self._context_pool = None
+        self._context_pages = {}
+        self._host_contexts.clear()
+        self._idle_pages = {}
+        self.context = None
         
-        if self.browser:
+        if self.browser and self.browser is not self._shared_browser:
             await self.browser.close()
-            self.browser = None
+        self.browser = None
+        
+        if self._results_stream is not None:
+            self._results_stream.close()
+            self._results_stream = None
+        
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
+        
+        if self._phash_db is not None:
+            with self._phash_lock:
+                self._phash_db.close()
+                self._phash_db = None
+    
+    def _open_phash_cache(self) -> None:
+        """Open (creating if needed) the perceptual hash cache."""
+        # Used from _postprocess worker threads, serialised by _phash_lock
+        db = sqlite3.connect(self.phash_cache_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS phash_cache (file_sha TEXT PRIMARY KEY, phash TEXT NOT NULL)"
+        )
+        db.commit()
+        self._phash_db = db
+    
+    def _cached_phash(self, screenshot_hash: str) -> Optional[str]:
+        """Look up a previously computed perceptual hash."""
+        if self._phash_db is None:
+            return None
+        with self._phash_lock:
+            row = self._phash_db.execute(
+                "SELECT phash FROM phash_cache WHERE file_sha = ?", (screenshot_hash,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def _cache_phash(self, screenshot_hash: str, phash: str) -> None:
+        """Remember a computed perceptual hash for later runs."""
+        if self._phash_db is None:
+            return
+        with self._phash_lock:
+            self._phash_db.execute(
+                "INSERT OR REPLACE INTO phash_cache (file_sha, phash) VALUES (?, ?)",
+                (screenshot_hash, phash)
+            )
+            self._phash_db.commit()
+    
+    async def _new_context(self) -> BrowserContext:
+        """Create a browser context with the configured viewport and user agent."""
+        context = await self.browser.new_context(
+            viewport={"width": self.config.viewport_width, "height": self.config.viewport_height},
+            user_agent=self.config.user_agent
+        )
+        # Covers goto() on reused pages and the post-navigation load settle too
+        context.set_default_navigation_timeout(self.config.timeout_ms)
+        
+        # Only install a route when something is blocked; routing every request
+        # through Python has its own per-request cost
+        if self._blocked_resources:
+            await context.route("**/*", self._route_blocked_resources)
+        
+        return context
+    
+    async def _route_blocked_resources(self, route) -> None:
+        """Abort requests for blocked resource types and let everything else through."""
+        if route.request.resource_type in self._blocked_resources:
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def _acquire_context(self, host: Optional[str] = None) -> BrowserContext:
+        """
+        Take a context from the pool (or the single context if there is no pool).
+        
+        The context that last served host is preferred when it is idle, so the
+        page can reuse that context's connections; otherwise any idle one is taken.
+        """
+        if self._context_pool is None:
+            return self.context
+        preferred = self._host_contexts.get(host) if host is not None else None
+        if preferred is not None and self._context_pool.take_nowait(preferred):
+            return preferred
+        return await self._context_pool.get()
+    
+    async def _release_context(self, context: BrowserContext, host: Optional[str] = None) -> None:
+        """Return a context to the pool, replacing it once it has served enough pages."""
+        if self._context_pool is None:
+            return
+        
+        pages = self._context_pages.get(id(context), 0) + 1
+        if pages >= self.config.max_pages_per_context:
+            self._context_pages.pop(id(context), None)
+            # The parked page goes with its context
+            self._idle_pages.pop(id(context), None)
+            try:
+                replacement = await self._new_context()
+            except Exception as e:
+                # Keep the old context rather than shrinking the pool
+                logger.warning("context_recycle_failed", error=str(e))
+                self._context_pages[id(context)] = 0
+                self._context_pool.put_nowait(context)
+                return
+            
+            self._contexts[self._contexts.index(context)] = replacement
+            if self.context is context:
+                self.context = replacement
+            # Host affinity must not point at the closed context
+            for stale_host in [h for h, c in self._host_contexts.items() if c is context]:
+                del self._host_contexts[stale_host]
+            await context.close()
+            logger.debug("context_recycled", pages=pages)
+            context = replacement
+        else:
+            self._context_pages[id(context)] = pages
+            if host is not None:
+                self._host_contexts[host] = context
+                self._host_contexts.move_to_end(host)
+                if len(self._host_contexts) > _MAX_HOST_AFFINITIES:
+                    self._host_contexts.popitem(last=False)
+        
+        self._context_pool.put_nowait(context)
+    
+    async def _acquire_page(self, context: BrowserContext) -> Page:
+        """Reuse the page parked on this context, or open a new one."""
+        page = self._idle_pages.pop(id(context), None)
+        if page is not None:
+            return page
+        return await context.new_page()
+    
+    async def _release_page(self, context: BrowserContext, page: Page, reusable: bool) -> None:
+        """Park a page on its pooled context for the next scrape, or close it.
+        
+        Pages are only reused after a clean scrape; pages that errored or timed
+        out are closed. Parked pages are discarded along with their context when
+        it is recycled, which bounds renderer memory growth.
+        """
+        if reusable and self._context_pool is not None:
+            try:
+                await page.goto('about:blank')
+                self._idle_pages[id(context)] = page
+                return
+            except Exception:
+                pass
+        await page.close()
+    
+    @property
+    def results_stream_path(self) -> Path:
+        """Path of the incrementally written JSONL results file."""
+        return self.config.output_dir / f"{self.config.job_id}_results.jsonl"
+    
+    @property
+    def phash_cache_path(self) -> Path:
+        """SQLite cache of perceptual hashes shared by jobs in this output directory."""
+        return self.config.output_dir / ".phash_cache.db"
+    
+    def _stream_result(self, result: ScrapingResult) -> None:
+        """Append a single result to the JSONL results file, if open."""
+        if self._results_stream is None:
+            return
+        self._results_stream.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
     
     def load_html_content(self, result: ScrapingResult) -> str:
         """Load HTML content from the saved file."""
@@ -77,6 +407,9 @@ class SiteScraper:
         
         try:
             html_file_path = self.config.output_dir / result.html_path
+            if html_file_path.suffix == '.zst':
+                compressed = html_file_path.read_bytes()
+                return zstandard.ZstdDecompressor().decompress(compressed).decode('utf-8')
             with open(html_file_path, 'r', encoding='utf-8') as f:
                 return f.read()
         except Exception as e:
@@ -85,13 +418,51 @@ class SiteScraper:
                         error=str(e))
             return ""
     
+    def _store_content_addressed(self, subdir: str, digest: str, extension: str,
+                                 data: Union[bytes, Callable[[], bytes]]) -> str:
+        """Write data to subdir/<digest[:2]>/<digest><extension> unless it already exists.
+        
+        Filenames are derived from the content hash, so an existing file is
+        guaranteed to hold the same bytes and the write can be skipped. Files
+        are sharded by the first two hex digits to keep directories small.
+        data may be a callable so that encoding (e.g. compression) only happens
+        when the file actually has to be written.
+        Returns the path relative to the output directory.
+        """
+        relative_path = f"{subdir}/{digest[:2]}/{digest}{extension}"
+        if relative_path in self._stored_objects:
+            return relative_path
+        
+        full_path = self.config.output_dir / relative_path
+        if not full_path.exists():
+            if callable(data):
+                data = data()
+            if full_path.parent not in self._known_dirs:
+                full_path.parent.mkdir(parents=True, exist_ok=True)
+                self._known_dirs.add(full_path.parent)
+            # Write under a temporary name and rename, so a concurrent writer of the
+            # same content never exposes a partially written file
+            tmp_path = full_path.with_name(f".{full_path.name}.{uuid.uuid4().hex}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, full_path)
+        
+        self._stored_objects.add(relative_path)
+        return relative_path
+    
     async def check_ssl_certificate(self, url: str) -> SSLInfo:
-        """Check SSL certificate information for a URL."""
+        """
+        Check SSL certificate information for a URL.
+        
+        SSLChecker caches certificates per host and shares in-flight handshakes,
+        while leaving transient failures uncached so they're retried.
+        """
         return await SSLChecker.check_certificate(url)
     
     async def scrape_url(self, url: str) -> ScrapingResult:
         """Scrape a single URL and return the result."""
-        start_time = asyncio.get_event_loop().time()
+        # Set when navigation starts, so time spent waiting for a host or net
+        # slot and a pooled context isn't counted as load time
+        start_time = None
         original_url = url
         
         # Ensure URL has protocol
@@ -103,14 +474,21 @@ class SiteScraper:
         # Extract initial domain
         domain = ContentExtractor.extract_domain(url)
         
-        # Check SSL certificate first (lightweight operation)
-        ssl_info = await self.check_ssl_certificate(url)
+        def elapsed_ms() -> int:
+            if start_time is None:
+                return 0
+            return int((time.perf_counter() - start_time) * 1000)
         
         # Initialize default result for error cases
-        def create_error_result(status: str, error_msg: str, 
-                              final_url: str = None, 
-                              redirected: bool = False,
-                              load_time_ms: int = None) -> ScrapingResult:
+        async def create_error_result(status: str, error_msg: str, 
+                                      final_url: str = None, 
+                                      redirected: bool = False,
+                                      load_time_ms: int = None,
+                                      ssl_info: Optional[SSLInfo] = None) -> ScrapingResult:
+            
+            # Without a usable navigation response, check the certificate directly
+            if ssl_info is None:
+                ssl_info = await self.check_ssl_certificate(url)
             
             # Detect bot protection from error message
             bot_protection = BotDetector.detect_protection("", error_msg)
@@ -125,8 +503,8 @@ class SiteScraper:
                 html_size=0,
                 screenshot_path=None,
                 screenshot_hash=None,
-                load_time_ms=load_time_ms or int((asyncio.get_event_loop().time() - start_time) * 1000),
-                viewport_size=f"{self.config.viewport_width}x{self.config.viewport_height}",
+                load_time_ms=load_time_ms if load_time_ms is not None else elapsed_ms(),
+                viewport_size=self._viewport_str,
                 redirected=redirected,
                 ssl_info=ssl_info,
                 bot_protection=bot_protection,
@@ -134,174 +512,342 @@ class SiteScraper:
                 error_message=error_msg
             )
         
+        # (status, error_msg, final_url, redirected, load_time_ms) when navigation
+        # fails; the error result is built only after the page and slots are released
+        failure = None
+        
         try:
-            # Create new page
-            page: Page = await self.context.new_page()
-            
-            try:
-                # Navigate to URL with timeout
-                response = await page.goto(url, timeout=self.config.timeout_ms, wait_until='networkidle')
-                
-                # Calculate load time
-                load_time_ms = int((asyncio.get_event_loop().time() - start_time) * 1000)
-                
-                # Get final URL and check for redirects
-                final_url = page.url
-                redirected = final_url != url
-                domain = ContentExtractor.extract_domain(final_url)
-                
-                # Get HTML content
-                html_content = await page.content()
-                
-                # Detect bot protection
-                bot_protection = BotDetector.detect_protection(html_content)
-                
-                # Extract company name
-                company_name = ContentExtractor.extract_company_name(html_content, final_url)
-                
-                # Save HTML to file
-                timestamp = int(datetime.now().timestamp())
-                safe_domain = domain.replace('/', '_').replace(':', '_')
-                html_filename = f"{self.config.job_id}_{safe_domain}_{timestamp}.html"
-                html_path = f"html/{html_filename}"
-                full_html_path = self.config.output_dir / html_path
-                full_html_path.parent.mkdir(exist_ok=True)
-                
-                with open(full_html_path, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
-                
-                html_size = len(html_content.encode('utf-8'))
-                
-                # Take screenshot
-                screenshot_filename = f"{self.config.job_id}_{safe_domain}_{timestamp}.png"
-                screenshot_path = f"screenshots/{screenshot_filename}"
-                full_screenshot_path = self.config.output_dir / screenshot_path
-                full_screenshot_path.parent.mkdir(exist_ok=True)
-                
-                screenshot_data = await page.screenshot(path=full_screenshot_path, full_page=True)
-                screenshot_hash = ContentExtractor.calculate_screenshot_hash(screenshot_data)
-                
-                logger.info("scraping_completed", 
-                           url=final_url, 
-                           load_time_ms=load_time_ms,
-                           html_size=html_size,
-                           company=company_name)
-                
-                return ScrapingResult(
-                    job_id=self.config.job_id,
-                    original_url=original_url,
-                    final_url=final_url,
-                    domain=domain,
-                    company_name=company_name,
-                    html_path=html_path,
-                    html_size=html_size,
-                    screenshot_path=screenshot_path,
-                    screenshot_hash=screenshot_hash,
-                    load_time_ms=load_time_ms,
-                    viewport_size=f"{self.config.viewport_width}x{self.config.viewport_height}",
-                    redirected=redirected,
-                    ssl_info=ssl_info,
-                    bot_protection=bot_protection,
-                    status="success"
-                )
-                
-            except asyncio.TimeoutError:
-                logger.warning("scraping_timeout", url=url, timeout_ms=self.config.timeout_ms)
-                return create_error_result("timeout", f"Page load timeout after {self.config.timeout_ms}ms")
-                
-            except Exception as e:
-                error_msg = str(e)
-                logger.error("scraping_error", url=url, error=error_msg)
+            # Network phase: navigation and capture, bounded per host and by
+            # max_concurrent; the host slot is taken first so a task waiting on a
+            # busy host doesn't hold a global slot
+            async with self._host_semaphores[domain], self._net_semaphore:
+                context = await self._acquire_context(domain)
+                try:
+                    page: Page = await self._acquire_page(context)
+                except Exception:
+                    await self._release_context(context, domain)
+                    raise
                 
-                # Try to get final URL if navigation partially succeeded
-                final_url = url
-                redirected = False
+                page_reusable = False
                 try:
+                    # Navigate to URL with timeout
+                    start_time = time.perf_counter()
+                    response = await page.goto(url, timeout=self.config.timeout_ms,
+                                               wait_until=self.config.wait_until)
+                    
+                    # Give late scripts a bounded chance to finish instead of waiting
+                    # for the network to go idle, which analytics beacons can delay
+                    # by many seconds
+                    if self.config.settle_ms and self.config.wait_until in ('commit', 'domcontentloaded'):
+                        try:
+                            await page.wait_for_load_state('load', timeout=self.config.settle_ms)
+                        except PlaywrightTimeoutError:
+                            pass
+                    
+                    # Calculate load time
+                    load_time_ms = elapsed_ms()
+                    
+                    # Get final URL and check for redirects
                     final_url = page.url
                     redirected = final_url != url
-                except:
-                    pass
-                
-                return create_error_result("error", error_msg, final_url, redirected)
-                
-            finally:
-                await page.close()
-                
+                    
+                    # Get HTML content
+                    html_content = await page.content()
+                    
+                    # A full-page screenshot of a challenge/block page has no value
+                    # downstream, so skip the rasterisation entirely
+                    status = response.status if response else None
+                    blocked = BotDetector.is_block_page(html_content, status)
+                    if blocked or self.config.screenshot_mode == "none":
+                        screenshot_data = None
+                    else:
+                        screenshot_data = await page.screenshot(**self._screenshot_options)
+                    
+                    # Certificate details from the browser's own TLS handshake
+                    security_details = await response.security_details() if response else None
+                    page_reusable = True
+                    
+                except asyncio.TimeoutError:
+                    logger.warning("scraping_timeout", url=url, timeout_ms=self.config.timeout_ms)
+                    failure = ("timeout", f"Page load timeout after {self.config.timeout_ms}ms",
+                               None, False, elapsed_ms())
+                    
+                except Exception as e:
+                    error_msg = str(e)
+                    logger.error("scraping_error", url=url, error=error_msg)
+                    
+                    # Try to get final URL if navigation partially succeeded
+                    final_url = url
+                    redirected = False
+                    try:
+                        final_url = page.url
+                        redirected = final_url != url
+                    except:
+                        pass
+                    
+                    failure = ("error", error_msg, final_url, redirected, elapsed_ms())
+                    
+                finally:
+                    try:
+                        await self._release_page(context, page, page_reusable)
+                    finally:
+                        await self._release_context(context, domain)
+                    
         except Exception as e:
             error_msg = f"Browser error: {str(e)}"
             logger.error("browser_error", url=url, error=error_msg)
-            return create_error_result("error", error_msg)
+            return await create_error_result("error", error_msg)
+        
+        # The fallback certificate check in create_error_result runs outside the
+        # host and net slots, so a slow handshake on a failed site doesn't hold them
+        if failure is not None:
+            return await create_error_result(*failure)
+        
+        if redirected:
+            domain = ContentExtractor.extract_domain(final_url)
+        
+        # Only open a separate TLS connection when the browser had none (plain HTTP)
+        if security_details:
+            ssl_info = SSLChecker.from_security_details(security_details)
+        else:
+            ssl_info = await self.check_ssl_certificate(url)
+        
+        # CPU phase: parsing, hashing and file writes run off the event loop so
+        # the next navigation can start while this page is processed
+        try:
+            async with self._cpu_semaphore:
+                (bot_protection, company_name, html_path, html_size,
+                 screenshot_path, screenshot_hash, screenshot_phash) = await asyncio.to_thread(
+                    self._postprocess, html_content, screenshot_data, final_url, blocked
+                )
+        except Exception as e:
+            error_msg = f"Post-processing error: {str(e)}"
+            logger.error("postprocessing_error", url=final_url, error=error_msg)
+            return await create_error_result("error", error_msg, final_url, redirected,
+                                             load_time_ms, ssl_info)
+        
+        logger.info("scraping_completed", 
+                   url=final_url, 
+                   load_time_ms=load_time_ms,
+                   html_size=html_size,
+                   company=company_name)
+        
+        return ScrapingResult(
+            job_id=self.config.job_id,
+            original_url=original_url,
+            final_url=final_url,
+            domain=domain,
+            company_name=company_name,
+            html_path=html_path,
+            html_size=html_size,
+            screenshot_path=screenshot_path,
+            screenshot_hash=screenshot_hash,
+            screenshot_phash=screenshot_phash,
+            load_time_ms=load_time_ms,
+            viewport_size=self._viewport_str,
+            redirected=redirected,
+            ssl_info=ssl_info,
+            bot_protection=bot_protection,
+            status="success"
+        )
     
-    async def scrape_urls(self, urls: List[str]) -> List[ScrapingResult]:
-        """Scrape multiple URLs concurrently."""
+    def _postprocess(self, html_content: str, screenshot_data: Optional[bytes], final_url: str,
+                     blocked: bool = False
+                     ) -> Tuple[BotProtectionInfo, str, str, int,
+                                Optional[str], Optional[str], Optional[str]]:
+        """
+        CPU-bound processing of a captured page (runs in a worker thread).
+        
+        screenshot_data is None when the screenshot was skipped for a block page.
+        
+        Returns:
+            Tuple of (bot_protection, company_name, html_path, html_size,
+            screenshot_path, screenshot_hash, screenshot_phash)
+        """
+        # Encoded once: used for bot detection, the content hash, html_size and the file
+        html_bytes = html_content.encode('utf-8')
+        
+        # Screenshots seen before (same bytes) reuse their cached perceptual hash
+        screenshot_hash = None
+        screenshot_phash = None
+        if screenshot_data is not None:
+            screenshot_hash = ContentExtractor.calculate_screenshot_hash(screenshot_data)
+            screenshot_phash = self._cached_phash(screenshot_hash)
+        
+        # Detect bot protection, extract the company name and compute the
+        # perceptual hash, in separate processes when configured so they aren't
+        # limited by the GIL; the pHash is submitted first so both run at once
+        phash_future = None
+        if self._parse_pool is not None:
+            if screenshot_data is not None and screenshot_phash is None:
+                phash_future = self._parse_pool.submit(
+                    ContentExtractor.calculate_perceptual_hash, screenshot_data
+                )
+            bot_protection, company_name = self._parse_pool.submit(
+                _analyze_html, html_content, final_url
+            ).result()
+        else:
+            bot_protection, company_name = _analyze_html(html_content, final_url, html_bytes)
+        if blocked:
+            bot_protection = BotDetector.mark_block_page(bot_protection)
+        
+        # Save HTML under its content hash so identical pages share one file;
+        # the hash and html_size always refer to the uncompressed bytes
+        html_digest = hashlib.sha256(html_bytes).hexdigest()
+        if self.config.compress_html:
+            html_path = self._store_content_addressed(
+                "html", html_digest, ".html.zst", lambda: _zstd_compressor().compress(html_bytes)
+            )
+        else:
+            html_path = self._store_content_addressed("html", html_digest, ".html", html_bytes)
+        html_size = len(html_bytes)
+        
+        # Store the screenshot under its hash as well; the perceptual hash is
+        # kept alongside for near-duplicate matching, since byte-identical
+        # screenshots are rare
+        screenshot_path = None
+        if screenshot_data is not None:
+            screenshot_path = self._store_content_addressed(
+                "screenshots", screenshot_hash, self._screenshot_ext, screenshot_data
+            )
+            if screenshot_phash is None:
+                if phash_future is not None:
+                    screenshot_phash = phash_future.result()
+                else:
+                    screenshot_phash = ContentExtractor.calculate_perceptual_hash(screenshot_data)
+                if screenshot_phash is not None:
+                    self._cache_phash(screenshot_hash, screenshot_phash)
+        
+        return (bot_protection, company_name, html_path, html_size,
+                screenshot_path, screenshot_hash, screenshot_phash)
+    
+    async def scrape_urls(self, urls: Iterable[str]) -> List[ScrapingResult]:
+        """
+        Scrape multiple URLs concurrently.
+        
+        Lists are scheduled round-robin across hosts; other iterables (e.g.
+        iter_urls_from_file()) are consumed lazily in order. See iter_scrape().
+        
+        Returns:
+            One result per URL, in input order
+        """
+        results: Dict[int, ScrapingResult] = {}
+        async for i, result in self.iter_scrape(urls):
+            results[i] = result
+        return [results[i] for i in range(len(results))]
+    
+    async def iter_scrape(self, urls: Iterable[str]) -> AsyncIterator[Tuple[int, ScrapingResult]]:
+        """
+        Scrape multiple URLs concurrently, yielding results as they complete.
+        
+        URLs are fed to a fixed set of workers through a bounded queue, so
+        memory stays proportional to the worker count rather than the batch.
+        Callers can process each result while later URLs are still loading.
+        
+        Yields:
+            (index, result) pairs in completion order, where index is the
+            URL's position in urls
+        """
         if not self.browser:
             await self.start()
         
         logger.info("starting_batch_scraping", 
-                   url_count=len(urls), 
+                   url_count=len(urls) if isinstance(urls, Sequence) else None, 
                    max_concurrent=self.config.max_concurrent,
                    job_id=self.config.job_id)
         
-        semaphore = asyncio.Semaphore(self.config.max_concurrent)
-        
-        async def scrape_with_semaphore(url: str) -> ScrapingResult:
-            async with semaphore:
-                result = await self.scrape_url(url)
-                self.results.append(result)
-                return result
-        
-        # Create tasks for all URLs
-        tasks = [scrape_with_semaphore(url) for url in urls]
-        
-        # Run all tasks concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Handle any exceptions
-        final_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error("task_exception", url=urls[i], error=str(result))
-                # Create error result for failed tasks
-                error_result = ScrapingResult(
-                    job_id=self.config.job_id,
-                    original_url=urls[i],
-                    final_url=urls[i],
-                    domain=ContentExtractor.extract_domain(urls[i]),
-                    company_name=None,
-                    html_path=None,
-                    html_size=0,
-                    screenshot_path=None,
-                    screenshot_hash=None,
-                    load_time_ms=0,
-                    viewport_size=f"{self.config.viewport_width}x{self.config.viewport_height}",
-                    redirected=False,
-                    ssl_info=SSLInfo(has_ssl=False, is_valid=False, certificate_error="Task failed"),
-                    bot_protection=BotProtectionInfo(detected=False),
-                    status="error",
-                    error_message=str(result)
-                )
-                final_results.append(error_result)
-            else:
-                final_results.append(result)
+        # Start URLs round-robin across hosts when the batch is known up front
+        if isinstance(urls, Sequence):
+            feed = ((i, urls[i]) for i in _interleave_by_host(urls))
+        else:
+            feed = enumerate(urls)
+        
+        # Concurrency is bounded inside scrape_url by the network and CPU
+        # semaphores; the extra workers keep navigation slots busy while other
+        # pages are in their CPU phase
+        worker_count = self.config.max_concurrent + _available_cpus()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=worker_count * 2)
+        # Completed (index, result) pairs; None marks the end of the batch
+        completed: asyncio.Queue = asyncio.Queue()
+        
+        async def worker() -> None:
+            while True:
+                i, url = await queue.get()
+                try:
+                    result = await self.scrape_url(url)
+                    self.results.append(result)
+                    self._stream_result(result)
+                except Exception as e:
+                    logger.error("task_exception", url=url, error=str(e))
+                    result = self._task_error_result(url, e)
+                finally:
+                    queue.task_done()
+                completed.put_nowait((i, result))
         
-        return final_results
+        async def produce() -> None:
+            try:
+                for item in feed:
+                    await queue.put(item)
+                await queue.join()
+            finally:
+                completed.put_nowait(None)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(worker_count)]
+        producer = asyncio.create_task(produce())
+        try:
+            while (item := await completed.get()) is not None:
+                yield item
+            # Surface a failure reading the URLs themselves
+            await producer
+        finally:
+            producer.cancel()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(producer, *workers, return_exceptions=True)
+    
+    def _task_error_result(self, url: str, error: Exception) -> ScrapingResult:
+        """Error result for a URL whose scrape raised instead of returning."""
+        return ScrapingResult(
+            job_id=self.config.job_id,
+            original_url=url,
+            final_url=url,
+            domain=ContentExtractor.extract_domain(url),
+            company_name=None,
+            html_path=None,
+            html_size=0,
+            screenshot_path=None,
+            screenshot_hash=None,
+            load_time_ms=0,
+            viewport_size=self._viewport_str,
+            redirected=False,
+            ssl_info=SSLInfo(has_ssl=False, is_valid=False, certificate_error="Task failed"),
+            bot_protection=BotProtectionInfo(detected=False),
+            status="error",
+            error_message=str(error)
+        )
     
     def save_results_json(self, output_path: Optional[Path] = None) -> Path:
-        """Save scraping results to JSON file."""
+        """
+        Save scraping results to JSON file.
+        
+        This is blocking file I/O; async callers should run it with
+        ``asyncio.to_thread`` once scraping has finished.
+        """
         if output_path is None:
             output_path = self.config.output_dir / f"{self.config.job_id}_scraping_results.json"
         
-        # Calculate summary statistics
-        successful = sum(1 for r in self.results if r.status == "success")
-        timeouts = sum(1 for r in self.results if r.status == "timeout")
-        errors = sum(1 for r in self.results if r.status == "error")
+        # Calculate summary statistics in a single pass
+        status_counts = Counter(r.status for r in self.results)
+        successful = status_counts["success"]
+        timeouts = status_counts["timeout"]
+        errors = status_counts["error"]
         
         # Create output data
         output_data = {
             "job_id": self.config.job_id,
             "timestamp": datetime.now().isoformat(),
             "config": {
-                "viewport_size": f"{self.config.viewport_width}x{self.config.viewport_height}",
+                "viewport_size": self._viewport_str,
                 "timeout_ms": self.config.timeout_ms,
                 "max_concurrent": self.config.max_concurrent
             },
@@ -311,32 +857,122 @@ class SiteScraper:
                 "timeouts": timeouts,
                 "errors": errors
             },
-            "results": [asdict(result) for result in self.results]
+            # orjson serialises the dataclasses natively, so no asdict() copies
+            "results": self.results
         }
         
-        # Save to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        # Serialise up front and write the blob in one call
+        output_path.write_bytes(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
         
         logger.info("results_saved", 
                    path=output_path, 
                    total_results=len(self.results),
                    successful=successful)
         
+        self.save_manifest()
+        
+        return output_path
+    
+    def rewrite_results_stream(self) -> Path:
+        """
+        Replace the JSONL results file with one line per entry in self.results.
+        
+        The stream is append-only while scraping, so a job that merges in
+        results it didn't scrape (cache hits, a retried job's successes)
+        rewrites it afterwards. Blocking file I/O, like save_results_json().
+        """
+        output_path = self.results_stream_path
+        tmp_path = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'wb') as f:
+            for result in self.results:
+                f.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
+        os.replace(tmp_path, output_path)
+        return output_path
+    
+    def save_manifest(self, output_path: Optional[Path] = None) -> Path:
+        """
+        Save the content hashes this job references.
+        
+        HTML and screenshot files are shared between jobs writing to the same
+        output directory, so the manifest records which stored objects belong
+        to this run (e.g. for cleanup or copying a single job elsewhere).
+        """
+        if output_path is None:
+            output_path = self.config.output_dir / f"{self.config.job_id}_manifest.json"
+        
+        html_hashes = set()
+        screenshot_hashes = set()
+        for result in self.results:
+            if result.html_path:
+                html_hashes.add(Path(result.html_path).name.split('.', 1)[0])
+            if result.screenshot_hash:
+                screenshot_hashes.add(result.screenshot_hash)
+        
+        manifest = {
+            "job_id": self.config.job_id,
+            "html": sorted(html_hashes),
+            "screenshots": sorted(screenshot_hashes)
+        }
+        
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+        
+        logger.info("manifest_saved", path=output_path,
+                   html_objects=len(html_hashes),
+                   screenshot_objects=len(screenshot_hashes))
+        
         return output_path
     
+    @staticmethod
+    def load_results_json(results_path: Path) -> List[ScrapingResult]:
+        """
+        Load the results of an earlier job saved by save_results_json().
+        
+        Raises:
+            OSError: If the file can't be read
+            ValueError: If the file isn't a results JSON document
+        """
+        data = orjson.loads(Path(results_path).read_bytes())
+        try:
+            return [ScrapingResult.from_dict(entry) for entry in data["results"]]
+        except (TypeError, KeyError) as e:
+            raise ValueError(f"Invalid results file {results_path}: {e}") from e
+    
+    @classmethod
+    def iter_urls_from_file(cls, file_path: Path) -> Iterator[str]:
+        """
+        Yield URLs from a text file, skipping comments and empty lines.
+        
+        The file is streamed, so memory use doesn't grow with its size.
+        
+        Raises:
+            OSError: If the file can't be opened or read
+        """
+        # Filter as bytes, decoding only the lines kept
+        with open(file_path, 'rb', buffering=1 << 20) as f:
+            for line in f:
+                line = line.strip()
+                # Skip empty lines and comments
+                if line and not line.startswith(b'#'):
+                    yield line.decode('utf-8')
+    
     @classmethod
     def load_urls_from_file(cls, file_path: Path) -> List[str]:
-        """Load URLs from a text file, filtering out comments and empty lines."""
+        """
+        Load URLs from a text file, filtering out comments and empty lines.
+        
+        The whole file is read and split in one go, which is much faster than
+        iterating it line by line; use iter_urls_from_file() to stream files
+        too large to hold in memory.
+        """
         urls = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    # Skip empty lines and comments
-                    if line and not line.startswith('#'):
-                        urls.append(line)
+            urls = [
+                line.decode('utf-8')
+                for line in (raw.strip() for raw in Path(file_path).read_bytes().splitlines())
+                if line and not line.startswith(b'#')
+            ]
             
             logger.info("urls_loaded_from_file", 
                        file_path=file_path, 
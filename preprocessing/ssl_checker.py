@@ -8,8 +8,9 @@ Validates SSL certificates, checks expiry dates, and provides certificate inform
 import asyncio
 import socket
 import ssl
+import time
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 from urllib.parse import urlparse
 
 import structlog
@@ -20,10 +21,61 @@ logger = structlog.get_logger()
 
 __all__ = ['SSLChecker']
 
+# Certificate dates are always in the C locale: 'Jan  1 00:00:00 2025 GMT'
+_MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12,
+}
+
+
+def _parse_cert_date(value: str) -> datetime:
+    """
+    Parse a certificate notBefore/notAfter string as an aware UTC datetime.
+    
+    Slices the fixed-width OpenSSL format directly instead of strptime, which
+    re-parses its format string and matches month names per locale.
+    
+    Raises:
+        ValueError: If the string isn't in the expected format
+    """
+    if len(value) != 24 or not value.endswith(' GMT'):
+        # Fallback to strptime for anything non-standard
+        expires_dt = datetime.strptime(value, '%b %d %H:%M:%S %Y %Z')
+        return expires_dt.replace(tzinfo=timezone.utc)
+    try:
+        month = _MONTHS[value[0:3]]
+    except KeyError:
+        raise ValueError(f"Unknown month in certificate date: {value!r}") from None
+    return datetime(int(value[16:20]), month, int(value[4:6]),
+                    int(value[7:9]), int(value[10:12]), int(value[13:15]),
+                    tzinfo=timezone.utc)
+
 
 class SSLChecker:
     """SSL Certificate validation and analysis."""
     
+    # Built on first use; loading the system CA bundle is the expensive part of
+    # create_default_context(), so every check shares one context
+    _ssl_context: Optional[ssl.SSLContext] = None
+    
+    # Certificate results per (hostname, port), so repeat hosts and shared CDNs
+    # skip the handshake; in-flight checks are shared by concurrent callers
+    CERT_CACHE_TTL = 3600.0
+    _cert_cache: Dict[Tuple[str, int], Tuple[float, SSLInfo]] = {}
+    _cert_checks: Dict[Tuple[str, int], asyncio.Task] = {}
+    
+    @classmethod
+    def _get_ssl_context(cls) -> ssl.SSLContext:
+        """Return the shared client SSL context, creating it if needed."""
+        if cls._ssl_context is None:
+            context = ssl.create_default_context()
+            # Browsers don't apply OpenSSL's strict X.509 checks, so a certificate
+            # the page loaded with shouldn't fail here. CRL checks stay disabled
+            # (the default), so verification never makes its own network calls.
+            context.verify_flags &= ~ssl.VERIFY_X509_STRICT
+            cls._ssl_context = context
+        return cls._ssl_context
+    
     @staticmethod
     async def check_certificate(url: str) -> SSLInfo:
         """
@@ -55,20 +107,61 @@ class SSLChecker:
                 certificate_error="Invalid hostname"
             )
         
+        key = (hostname, port)
+        cached = SSLChecker._cert_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < SSLChecker.CERT_CACHE_TTL:
+            return cached[1]
+        
+        loop = asyncio.get_running_loop()
+        task = SSLChecker._cert_checks.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(SSLChecker._fetch_certificate(hostname, port))
+            SSLChecker._cert_checks[key] = task
+            task.add_done_callback(lambda t: SSLChecker._finish_check(key, t))
+        
+        # Shield so a cancelled caller doesn't cancel the check for other waiters
+        return await asyncio.shield(task)
+    
+    @classmethod
+    def _finish_check(cls, key: Tuple[str, int], task: asyncio.Task) -> None:
+        """Drop a completed check from the in-flight table and cache its result."""
+        if cls._cert_checks.get(key) is task:
+            del cls._cert_checks[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        
+        # Timeouts and connection failures may be transient, so only certificates
+        # and TLS verification errors are cached
+        ssl_info = task.result()
+        if ssl_info.is_valid or (ssl_info.certificate_error or '').startswith('SSL Error'):
+            cls._cert_cache[key] = (time.monotonic(), ssl_info)
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Forget all cached certificate results."""
+        cls._cert_cache.clear()
+        cls._cert_checks.clear()
+    
+    @staticmethod
+    async def _fetch_certificate(hostname: str, port: int) -> SSLInfo:
+        """Connect to hostname:port and build SSLInfo from its certificate."""
         try:
-            # Create SSL context
-            context = ssl.create_default_context()
+            context = SSLChecker._get_ssl_context()
             
-            # Connect and get certificate
-            loop = asyncio.get_event_loop()
-            
-            def get_certificate():
-                with socket.create_connection((hostname, port), timeout=10) as sock:
-                    with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                        return ssock.getpeercert()
-            
-            # Run in thread pool to avoid blocking
-            cert = await loop.run_in_executor(None, get_certificate)
+            # Handshake on the event loop rather than a blocking socket in the
+            # default thread pool, which caps concurrency at its worker count
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(hostname, port, ssl=context, server_hostname=hostname),
+                timeout=10
+            )
+            try:
+                cert = writer.get_extra_info('peercert')
+            finally:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except Exception:
+                    pass
             
             if not cert:
                 return SSLInfo(
@@ -88,19 +181,7 @@ class SSLChecker:
             
             if expires_str:
                 try:
-                    # Parse certificate date format: 'Jan  1 00:00:00 2025 GMT'  
-                    # strptime with %Z often creates naive datetimes, so parse without %Z first
-                    if expires_str.endswith(' GMT'):
-                        # Remove GMT suffix and parse as naive, then add UTC timezone
-                        date_part = expires_str[:-4]  # Remove ' GMT'
-                        expires_dt = datetime.strptime(date_part, '%b %d %H:%M:%S %Y')
-                        expires_dt = expires_dt.replace(tzinfo=timezone.utc)
-                    else:
-                        # Fallback to original parsing
-                        expires_dt = datetime.strptime(expires_str, '%b %d %H:%M:%S %Y %Z')
-                        if expires_dt.tzinfo is None:
-                            expires_dt = expires_dt.replace(tzinfo=timezone.utc)
-                    
+                    expires_dt = _parse_cert_date(expires_str)
                     expires_date = expires_dt.isoformat()
                     
                     # Calculate days until expiry - ensure both datetimes are timezone-aware
@@ -113,10 +194,12 @@ class SSLChecker:
                                  date_string=expires_str,
                                  error=str(e))
             
+            # Issuer common name (e.g. "R3"), the same value the browser reports
+            # in from_security_details()
             return SSLInfo(
                 has_ssl=True,
                 is_valid=True,
-                issuer=issuer.get('organizationName', issuer.get('commonName', 'Unknown')),
+                issuer=issuer.get('commonName', issuer.get('organizationName', 'Unknown')),
                 subject=subject.get('commonName', hostname),
                 expires_date=expires_date,
                 days_until_expiry=days_until_expiry
@@ -128,7 +211,7 @@ class SSLChecker:
                 is_valid=False,
                 certificate_error=f"SSL Error: {str(e)}"
             )
-        except socket.timeout:
+        except (asyncio.TimeoutError, socket.timeout):
             return SSLInfo(
                 has_ssl=True,
                 is_valid=False,
@@ -141,6 +224,49 @@ class SSLChecker:
                 certificate_error=f"Certificate check failed: {str(e)}"
             )
     
+    @staticmethod
+    def from_security_details(details: Dict[str, Any]) -> SSLInfo:
+        """
+        Build SSL information from Playwright's Response.security_details().
+        
+        The browser has already completed the TLS handshake for the page, so
+        this avoids a second connection to the same host. Validity is checked
+        against the certificate's validFrom/validTo dates, since a page can load
+        with an expired certificate.
+        
+        Args:
+            details: Dict with 'issuer' (common name), 'subjectName', 'validFrom',
+                'validTo' (Unix timestamps) and 'protocol' keys
+            
+        Returns:
+            SSLInfo object with certificate details
+        """
+        now = time.time()
+        expires_date = None
+        days_until_expiry = None
+        certificate_error = None
+        
+        valid_from = details.get('validFrom')
+        valid_to = details.get('validTo')
+        if valid_to is not None:
+            expires_dt = datetime.fromtimestamp(valid_to, timezone.utc)
+            expires_date = expires_dt.isoformat()
+            days_until_expiry = (expires_dt - datetime.fromtimestamp(now, timezone.utc)).days
+            if valid_to <= now:
+                certificate_error = "Certificate expired"
+        if valid_from is not None and valid_from > now:
+            certificate_error = "Certificate not yet valid"
+        
+        return SSLInfo(
+            has_ssl=True,
+            is_valid=certificate_error is None,
+            issuer=details.get('issuer') or 'Unknown',
+            subject=details.get('subjectName'),
+            expires_date=expires_date,
+            days_until_expiry=days_until_expiry,
+            certificate_error=certificate_error
+        )
+    
     @staticmethod
     def is_certificate_expiring_soon(ssl_info: SSLInfo, days_threshold: int = 30) -> bool:
         """
@@ -7,17 +7,152 @@ Designed for easy integration with Agno agents or other tool frameworks.
 """
 
 import asyncio
+import functools
+import itertools
 import uuid
+from collections import Counter
+from dataclasses import replace
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union
+from typing import AsyncIterator, Dict, Any, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
 
 import structlog
 
-from .scraper import SiteScraper, ScrapingConfig, ScrapingResult, SSLInfo
+from playwright.async_api import async_playwright, Browser
+
+from .scraper import SiteScraper, ScrapingConfig, ScrapingResult
+from .scrape_cache import ScrapeCache
+from .ssl_checker import SSLChecker
 
 logger = structlog.get_logger()
 
 
+class _BrowserPool:
+    """
+    Keeps one Chromium instance running between scrape_websites calls.
+    
+    The browser is shut down once it has been idle for idle_timeout_s. It is
+    tied to the event loop that launched it; calls from another loop start a
+    fresh one.
+    """
+    
+    def __init__(self, idle_timeout_s: float = 60.0):
+        self.idle_timeout_s = idle_timeout_s
+        self._playwright = None
+        self._browser: Optional[Browser] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._users = 0
+        self._reaper: Optional[asyncio.TimerHandle] = None
+    
+    async def acquire(self) -> Browser:
+        """Return the warm browser, launching it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._reset(loop)
+        async with self._lock:
+            if self._reaper is not None:
+                self._reaper.cancel()
+                self._reaper = None
+            if self._browser is None or not self._browser.is_connected():
+                logger.info("starting_shared_browser")
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+            self._users += 1
+            return self._browser
+    
+    def release(self) -> None:
+        """Hand the browser back; the last user starts the idle countdown."""
+        self._users -= 1
+        if self._users == 0 and self._loop is not None and not self._loop.is_closed():
+            self._reaper = self._loop.call_later(
+                self.idle_timeout_s, lambda: asyncio.ensure_future(self.shutdown())
+            )
+    
+    async def shutdown(self) -> None:
+        """Close the browser now, unless it has been acquired again."""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        async with self._lock:
+            if self._users or self._browser is None:
+                return
+            browser, playwright = self._browser, self._playwright
+            self._browser = self._playwright = None
+            try:
+                await browser.close()
+                await playwright.stop()
+            except Exception as e:
+                logger.warning("shared_browser_close_failed", error=str(e))
+    
+    def _reset(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Forget a browser launched on another (typically finished) event loop."""
+        self._playwright = None
+        self._browser = None
+        self._users = 0
+        self._reaper = None
+        self._lock = asyncio.Lock()
+        self._loop = loop
+
+
+_BROWSER_POOL = _BrowserPool()
+
+
+async def close_shared_browser() -> None:
+    """Close the browser kept warm by scrape_websites(keep_browser_warm=True)."""
+    await _BROWSER_POOL.shutdown()
+
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _canonical_url(url: str) -> str:
+    """
+    Canonical form of a URL for duplicate detection.
+    
+    Scheme and host are lowercased, the scheme defaults to https (as the
+    scraper does), the default port and any fragment are dropped, and an
+    empty path becomes "/". Unparseable URLs are returned unchanged.
+    """
+    candidate = url.strip()
+    if not candidate.startswith(('http://', 'https://', 'HTTP://', 'HTTPS://')):
+        candidate = 'https://' + candidate
+    try:
+        parts = urlsplit(candidate)
+        scheme = parts.scheme.lower()
+        host = parts.hostname
+        port = parts.port
+    except ValueError:
+        return url
+    if not host:
+        return url
+    if ':' in host:
+        host = f"[{host}]"
+    netloc = host if port is None or port == _DEFAULT_PORTS.get(scheme) else f"{host}:{port}"
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{scheme}://{netloc}{parts.path or '/'}{query}"
+
+
+def _dedupe_urls(urls: List[str]) -> Tuple[List[str], List[int]]:
+    """
+    Drop URLs that canonicalise to one already seen, keeping input order.
+    
+    Returns:
+        Tuple of (unique URLs as first given, position in that list of each
+        input URL), so per-URL results can be expanded back to the input
+    """
+    first_seen: Dict[str, int] = {}
+    unique: List[str] = []
+    positions: List[int] = []
+    for url in urls:
+        key = _canonical_url(url)
+        position = first_seen.get(key)
+        if position is None:
+            position = first_seen[key] = len(unique)
+            unique.append(url)
+        positions.append(position)
+    return unique, positions
+
+
 async def scrape_websites(
     urls: Union[List[str], str],
     job_id: Optional[str] = None,
@@ -28,7 +163,12 @@ async def scrape_websites(
     max_concurrent: int = 5,
     user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
     save_screenshots: bool = True,
-    return_html: bool = True
+    return_html: bool = True,
+    lazy_html: bool = False,
+    cache_ttl_s: Optional[int] = None,
+    force_rescrape: bool = False,
+    retry_from_job_id: Optional[str] = None,
+    keep_browser_warm: bool = False
 ) -> Dict[str, Any]:
     """
     Scrape websites and return structured results.
@@ -46,6 +186,18 @@ async def scrape_websites(
         user_agent: Browser user agent string
         save_screenshots: Whether to save screenshot files
         return_html: Whether to include full HTML in results
+        lazy_html: With return_html, attach a content["load_html"] callable instead of
+            reading every page up front (use materialize_results() before serialising)
+        cache_ttl_s: Reuse successful results from earlier runs in the same output_dir
+            that are at most this many seconds old (None, the default, disables the cache)
+        force_rescrape: Scrape every URL even if a fresh cached result exists
+        retry_from_job_id: Re-scrape only the URLs that timed out or failed in this
+            earlier job in output_dir, keeping its successful results. With no urls,
+            every URL from that job is covered. job_id defaults to this id, so the
+            merged results overwrite the earlier job's results file.
+        keep_browser_warm: Leave the browser running for later calls on the same event
+            loop instead of launching one per call; it closes after 60 s idle or on
+            close_shared_browser()
         
     Returns:
         Dict containing:
@@ -63,7 +215,18 @@ async def scrape_websites(
         if isinstance(urls, str):
             url_list = [urls]
         else:
-            url_list = list(urls)
+            url_list = list(urls or [])
+        
+        prior_results: List[ScrapingResult] = []
+        if retry_from_job_id is not None:
+            prior_results = await asyncio.to_thread(
+                SiteScraper.load_results_json,
+                Path(output_dir) / f"{retry_from_job_id}_scraping_results.json"
+            )
+            if not url_list:
+                url_list = [r.original_url for r in prior_results]
+            if job_id is None:
+                job_id = retry_from_job_id
         
         if not url_list:
             return {
@@ -89,37 +252,95 @@ async def scrape_websites(
             user_agent=user_agent
         )
         
+        # Each distinct page is scraped once; duplicates share its result
+        unique_urls, positions = _dedupe_urls(url_list)
+        
         logger.info("tool_scraping_started", 
                    job_id=job_id,
                    url_count=len(url_list),
+                   unique_url_count=len(unique_urls),
                    output_dir=output_dir)
         
-        # Execute scraping
-        async with SiteScraper(config) as scraper:
-            raw_results = await scraper.scrape_urls(url_list)
-            
-            # Save results JSON
-            results_path = scraper.save_results_json()
+        # Serve fresh results from earlier runs; only the rest need the browser
+        cache = ScrapeCache(config.output_dir) if cache_ttl_s is not None else None
+        cached: Dict[str, ScrapingResult] = {}
+        if cache is not None and not force_rescrape:
+            cached = cache.get_many(unique_urls, config, cache_ttl_s)
+        # Successes from the job being retried are kept as they are
+        wanted = set(unique_urls)
+        for prior in prior_results:
+            if prior.status == "success" and prior.original_url in wanted:
+                cached.setdefault(prior.original_url, replace(prior, job_id=job_id))
+        pending = [i for i, url in enumerate(unique_urls) if url not in cached]
+        
+        browser = await _BROWSER_POOL.acquire() if keep_browser_warm and pending else None
+        scraper = SiteScraper(config, browser=browser)
+        try:
+            raw_results: List[Optional[ScrapingResult]] = [None] * len(unique_urls)
+            format_tasks: List[Optional[asyncio.Task]] = [None] * len(unique_urls)
+            # HTML files are content-addressed, so duplicate pages share a path
+            # and are read (and held in memory) once per call
+            html_cache: Dict[str, str] = {}
             
-            # Convert results to tool-friendly format
-            processed_results = []
-            for result in raw_results:
-                processed_result = _format_result_for_tool(
+            def record(i: int, result: ScrapingResult) -> None:
+                # Convert each result to the tool-friendly format (which may read
+                # its HTML back from disk) in a worker thread as soon as it
+                # completes, so formatting overlaps with the URLs still loading
+                raw_results[i] = result
+                format_tasks[i] = asyncio.create_task(asyncio.to_thread(
+                    _format_result_for_tool,
                     result, 
                     include_html=return_html, 
                     include_screenshot_path=save_screenshots,
-                    scraper=scraper
-                )
-                processed_results.append(processed_result)
+                    scraper=scraper,
+                    html_cache=html_cache,
+                    lazy_html=lazy_html
+                ))
+            
+            for i, url in enumerate(unique_urls):
+                if url in cached:
+                    record(i, cached[url])
+            
+            if pending:
+                async with scraper:
+                    scraped = []
+                    async for j, result in scraper.iter_scrape([unique_urls[i] for i in pending]):
+                        record(pending[j], result)
+                        scraped.append(result)
+                if cache is not None:
+                    cache.put_many(scraped, config)
+            
+            formatted_results = await asyncio.gather(*format_tasks)
+            
+            # Saved results follow input order, not cache hits first and then
+            # completion order; the JSONL stream only saw the scraped URLs (and,
+            # on a retry, still holds the earlier job's lines), so rewrite it
+            scraper.results = list(raw_results)
+            if len(pending) < len(unique_urls) or prior_results:
+                await asyncio.to_thread(scraper.rewrite_results_stream)
+            
+            # Expand back to one entry per input URL, in input order; each entry
+            # is its own copy and reports the spelling it was requested as
+            raw_results = [raw_results[p] for p in positions]
+            processed_results = [
+                _copy_for_spelling(formatted_results[p], url) for url, p in zip(url_list, positions)
+            ]
             
-            # Generate summary
-            successful = sum(1 for r in raw_results if r.status == "success")
-            timeouts = sum(1 for r in raw_results if r.status == "timeout")
-            errors = sum(1 for r in raw_results if r.status == "error")
+            # Save results JSON off the event loop; large jobs serialise tens of MB
+            results_path = await asyncio.to_thread(scraper.save_results_json)
+            
+            # Generate summary in a single pass over the results
+            status_counts: Counter = Counter()
+            total_load_ms = 0
+            for r in raw_results:
+                status_counts[r.status] += 1
+                total_load_ms += r.load_time_ms
             
             output_paths = {
                 "results_json": str(results_path),
-                "screenshots_dir": str(config.output_dir / "screenshots") if save_screenshots else None
+                "screenshots_dir": (
+                    str(config.output_dir / "screenshots") if save_screenshots else None
+                )
             }
             
             return {
@@ -127,14 +348,20 @@ async def scrape_websites(
                 "success": True,
                 "summary": {
                     "total": len(url_list),
-                    "successful": successful,
-                    "timeouts": timeouts, 
-                    "errors": errors
+                    "successful": status_counts["success"],
+                    "timeouts": status_counts["timeout"],
+                    "errors": status_counts["error"]
                 },
                 "results": processed_results,
                 "output_paths": output_paths,
-                "execution_time_ms": sum(r.load_time_ms for r in raw_results)
+                "execution_time_ms": total_load_ms,
+                "cached": len(unique_urls) - len(pending)
             }
+        finally:
+            if browser is not None:
+                _BROWSER_POOL.release()
+            if cache is not None:
+                cache.close()
             
     except Exception as e:
         logger.error("tool_scraping_failed", error=str(e), job_id=job_id)
@@ -148,13 +375,90 @@ async def scrape_websites(
         }
 
 
+async def scrape_websites_stream(
+    urls: Iterable[str],
+    batch_size: int = 100,
+    job_id: Optional[str] = None,
+    **options: Any
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Scrape websites in batches, yielding each batch's results as it finishes.
+    
+    Only one batch of results is held at a time and the first results arrive
+    after batch_size URLs rather than the whole list. urls is consumed lazily,
+    so it can be a generator such as SiteScraper.iter_urls_from_file().
+    
+    Args:
+        urls: URLs to scrape
+        batch_size: Number of URLs per batch
+        job_id: Base job identifier (auto-generated if not provided); batch n is
+            saved as job "<job_id>-<n>"
+        **options: Any other scrape_websites() argument except retry_from_job_id
+        
+    Yields:
+        The scrape_websites() result for each batch, plus:
+        - batch: Zero-based batch number
+        - accumulated: Summary counts over all batches so far
+        
+    Example:
+        >>> async for batch in scrape_websites_stream(urls, batch_size=50):
+        ...     print(batch["batch"], batch["accumulated"]["successful"])
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    if job_id is None:
+        job_id = str(uuid.uuid4())
+    
+    accumulated = {"total": 0, "successful": 0, "timeouts": 0, "errors": 0}
+    url_iter = iter(urls)
+    for batch in itertools.count():
+        batch_urls = list(itertools.islice(url_iter, batch_size))
+        if not batch_urls:
+            return
+        
+        result = await scrape_websites(batch_urls, job_id=f"{job_id}-{batch}", **options)
+        summary = result["summary"]
+        accumulated["total"] += len(batch_urls)
+        accumulated["successful"] += summary.get("successful", 0)
+        accumulated["timeouts"] += summary.get("timeouts", 0)
+        # A batch that failed outright counts every URL in it as an error
+        accumulated["errors"] += summary.get("errors", 0 if result["success"] else len(batch_urls))
+        
+        yield {**result, "batch": batch, "accumulated": dict(accumulated)}
+
+
+def _copy_for_spelling(formatted: Dict[str, Any], url: str) -> Dict[str, Any]:
+    """Copy a formatted result (down to its sections) and report it under url."""
+    copy = {key: dict(section) if isinstance(section, dict) else section
+            for key, section in formatted.items()}
+    copy["url"]["original"] = url
+    return copy
+
+
 def _format_result_for_tool(
     result: ScrapingResult, 
     include_html: bool = True,
     include_screenshot_path: bool = True,
-    scraper: Optional[SiteScraper] = None
+    scraper: Optional[SiteScraper] = None,
+    html_cache: Optional[Dict[str, str]] = None,
+    lazy_html: bool = False
 ) -> Dict[str, Any]:
-    """Format a ScrapingResult for tool consumption."""
+    """
+    Format a ScrapingResult for tool consumption.
+    
+    html_cache, if given, maps html_path to already loaded HTML and is filled
+    in as pages are read, so results sharing a stored page share one string.
+    With lazy_html, nothing is read here; content["load_html"] reads the page
+    when called.
+    """
+    # Bind the nested records once rather than re-resolving them per field
+    ssl = result.ssl_info
+    bot = result.bot_protection
+    content = {
+        "company_name": result.company_name,
+        "html_size": result.html_size,
+        "html_path": result.html_path,
+    }
     formatted = {
         "url": {
             "original": result.original_url,
@@ -162,25 +466,21 @@ def _format_result_for_tool(
             "domain": result.domain,
             "redirected": result.redirected
         },
-        "content": {
-            "company_name": result.company_name,
-            "html_size": result.html_size,
-            "html_path": result.html_path,
-        },
+        "content": content,
         "ssl": {
-            "has_ssl": result.ssl_info.has_ssl,
-            "is_valid": result.ssl_info.is_valid,
-            "issuer": result.ssl_info.issuer,
-            "subject": result.ssl_info.subject,
-            "expires_date": result.ssl_info.expires_date,
-            "days_until_expiry": result.ssl_info.days_until_expiry,
-            "certificate_error": result.ssl_info.certificate_error
+            "has_ssl": ssl.has_ssl,
+            "is_valid": ssl.is_valid,
+            "issuer": ssl.issuer,
+            "subject": ssl.subject,
+            "expires_date": ssl.expires_date,
+            "days_until_expiry": ssl.days_until_expiry,
+            "certificate_error": ssl.certificate_error
         },
         "bot_protection": {
-            "detected": result.bot_protection.detected,
-            "protection_type": result.bot_protection.protection_type,
-            "indicators": result.bot_protection.indicators,
-            "confidence": result.bot_protection.confidence
+            "detected": bot.detected,
+            "protection_type": bot.protection_type,
+            "indicators": bot.indicators,
+            "confidence": bot.confidence
         },
         "performance": {
             "load_time_ms": result.load_time_ms,
@@ -194,28 +494,67 @@ def _format_result_for_tool(
     }
     
     # Conditionally include heavy data
-    if include_html and result.html_path and scraper:
+    if include_html and result.html_path and scraper and lazy_html:
+        content["load_html"] = functools.partial(scraper.load_html_content, result)
+    elif include_html and result.html_path and scraper:
         try:
-            html_content = scraper.load_html_content(result)
-            formatted["content"]["html_content"] = html_content
+            html_content = html_cache.get(result.html_path) if html_cache is not None else None
+            if html_content is None:
+                html_content = scraper.load_html_content(result)
+                if html_cache is not None:
+                    html_cache[result.html_path] = html_content
+            content["html_content"] = html_content
         except Exception as e:
-            formatted["content"]["html_load_error"] = str(e)
+            content["html_load_error"] = str(e)
     
     if include_screenshot_path and result.screenshot_path:
-        formatted["content"]["screenshot_path"] = result.screenshot_path
-        formatted["content"]["screenshot_hash"] = result.screenshot_hash
+        content["screenshot_path"] = result.screenshot_path
+        content["screenshot_hash"] = result.screenshot_hash
+        content["screenshot_phash"] = result.screenshot_phash
     
     return formatted
 
 
-async def check_ssl_certificates(urls: Union[List[str], str]) -> Dict[str, Any]:
+def materialize_results(tool_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Resolve lazy HTML loaders in a scrape_websites(lazy_html=True) result.
+    
+    Each content["load_html"] callable is replaced by the html_content it
+    loads (or an html_load_error), so the result can be serialised to JSON.
+    
+    Args:
+        tool_result: Dict returned by scrape_websites
+        
+    Returns:
+        The same dict, updated in place
+    """
+    for formatted in tool_result.get("results", []):
+        content = formatted.get("content", {})
+        load_html = content.pop("load_html", None)
+        if load_html is None:
+            continue
+        try:
+            content["html_content"] = load_html()
+        except Exception as e:
+            content["html_load_error"] = str(e)
+    
+    return tool_result
+
+
+async def check_ssl_certificates(
+    urls: Union[List[str], str],
+    max_concurrent: int = 20
+) -> Dict[str, Any]:
     """
     Check SSL certificates for a list of URLs without full scraping.
     
-    Lightweight function focused only on SSL certificate analysis.
+    Lightweight function focused only on SSL certificate analysis. Checks run
+    concurrently, so total time is close to the slowest handshake rather than
+    the sum of all of them.
     
     Args:
         urls: Single URL string or list of URL strings to check
+        max_concurrent: Maximum concurrent TLS handshakes
         
     Returns:
         Dict containing SSL information for each URL
@@ -234,19 +573,15 @@ async def check_ssl_certificates(urls: Union[List[str], str]) -> Dict[str, Any]:
                 "results": []
             }
         
-        # Create a temporary scraper just for SSL checking
-        config = ScrapingConfig(
-            job_id="ssl-check",
-            output_dir=Path("/tmp/ssl-check")  # Won't be used
-        )
-        
-        scraper = SiteScraper(config)
-        results = []
+        # Only the TLS handshake is needed, so go straight to the checker
+        # rather than through a SiteScraper and its browser setup
+        semaphore = asyncio.Semaphore(max_concurrent)
         
-        for url in url_list:
+        async def check_one(url: str) -> Dict[str, Any]:
             try:
-                ssl_info = await scraper.check_ssl_certificate(url)
-                results.append({
+                async with semaphore:
+                    ssl_info = await SSLChecker.check_certificate(url)
+                return {
                     "url": url,
                     "ssl": {
                         "has_ssl": ssl_info.has_ssl,
@@ -257,26 +592,43 @@ async def check_ssl_certificates(urls: Union[List[str], str]) -> Dict[str, Any]:
                         "days_until_expiry": ssl_info.days_until_expiry,
                         "certificate_error": ssl_info.certificate_error
                     }
-                })
+                }
             except Exception as e:
-                results.append({
+                return {
                     "url": url,
                     "ssl": {
                         "has_ssl": False,
                         "is_valid": False,
                         "certificate_error": str(e)
                     }
-                })
+                }
+        
+        # A failing host is reported in its own entry rather than aborting the
+        # batch; duplicate URLs are checked once and reported under each spelling
+        unique_urls, positions = _dedupe_urls(url_list)
+        unique_results = await asyncio.gather(*(check_one(url) for url in unique_urls))
+        results = [{**unique_results[p], "url": url} for url, p in zip(url_list, positions)]
+        
+        # Summary counts in a single pass over the results
+        with_ssl = valid_ssl = expiring_soon = 0
+        for r in results:
+            ssl_data = r["ssl"]
+            if ssl_data["has_ssl"]:
+                with_ssl += 1
+            if ssl_data["is_valid"]:
+                valid_ssl += 1
+            days_left = ssl_data.get("days_until_expiry")
+            if days_left is not None and days_left < 30:
+                expiring_soon += 1
         
         return {
             "success": True,
             "results": results,
             "summary": {
                 "total": len(url_list),
-                "with_ssl": sum(1 for r in results if r["ssl"]["has_ssl"]),
-                "valid_ssl": sum(1 for r in results if r["ssl"]["is_valid"]),
-                "expiring_soon": sum(1 for r in results 
-                                   if r["ssl"].get("days_until_expiry") is not None and r["ssl"].get("days_until_expiry") < 30)
+                "with_ssl": with_ssl,
+                "valid_ssl": valid_ssl,
+                "expiring_soon": expiring_soon
             }
         }
         
@@ -342,7 +694,17 @@ AVAILABLE_TOOLS = {
             "timeout_ms": "Page load timeout in milliseconds (default: 30000)",
             "max_concurrent": "Max concurrent requests (default: 5)",
             "save_screenshots": "Whether to save screenshot files (default: True)",
-            "return_html": "Whether to include HTML in results (default: True)"
+            "return_html": "Whether to include HTML in results (default: True)",
+            "lazy_html": "Return a load_html callable instead of HTML (default: False)",
+            "cache_ttl_s": (
+                "Reuse results from earlier runs up to this age in seconds "
+                "(default: None, no cache)"
+            ),
+            "force_rescrape": "Ignore cached results and scrape every URL (default: False)",
+            "retry_from_job_id": (
+                "Re-scrape only the failed URLs of this earlier job (default: None)"
+            ),
+            "keep_browser_warm": "Reuse one browser across calls (default: False)"
         }
     },
     "check_ssl_certificates": {
@@ -350,7 +712,8 @@ AVAILABLE_TOOLS = {
         "description": "Check SSL certificate information for URLs",
         "async": True,
         "parameters": {
-            "urls": "List of URLs or single URL string"
+            "urls": "List of URLs or single URL string",
+            "max_concurrent": "Max concurrent certificate checks (default: 20)"
         }
     },
     "load_urls_from_file": {
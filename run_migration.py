@@ -3,8 +3,9 @@
 
 import asyncio
 import os
-import sys
+import re
 from pathlib import Path
+from typing import Dict, List, Optional
 
 import asyncpg
 import structlog
@@ -15,33 +16,101 @@ load_dotenv()
 
 logger = structlog.get_logger()
 
-async def run_migration(migration_file: Path):
-    """Run a specific migration file."""
-    # Database configuration
-    db_config = {
+# Scripts with their own BEGIN/COMMIT are run as-is rather than nested in a transaction.
+# Only the first statement counts: a BEGIN inside a DO block or function body doesn't
+_EXPLICIT_TRANSACTION_RE = re.compile(r'(?:BEGIN|START\s+TRANSACTION)\b', re.IGNORECASE)
+
+# Whitespace and comments that may precede a script's first statement
+_LEADING_COMMENTS_RE = re.compile(r'(?:\s+|--[^\n]*|/\*.*?\*/)*', re.DOTALL)
+
+# Records which migration files have been applied, so --apply-all skips them
+MIGRATIONS_TABLE = 'schema_migrations'
+
+# Leading numeric prefix of a migration file name, e.g. "001" in "001_add_column.sql"
+_LEVEL_PREFIX_RE = re.compile(r'^(\d+)_')
+
+def starts_with_transaction(migration_sql: str) -> bool:
+    """Whether a script's first statement is BEGIN or START TRANSACTION."""
+    start = _LEADING_COMMENTS_RE.match(migration_sql).end()
+    return _EXPLICIT_TRANSACTION_RE.match(migration_sql, start) is not None
+
+def get_db_config() -> dict:
+    """Database connection settings from the environment."""
+    return {
         'host': os.getenv('DB_HOST', 'localhost'),
         'port': int(os.getenv('DB_PORT', '5432')),
         'database': os.getenv('DB_NAME', 'site_analysis'),
         'user': os.getenv('DB_USER', 'postgres'),
         'password': os.getenv('DB_PASSWORD', ''),
     }
+
+async def ensure_migrations_table(conn: asyncpg.Connection):
+    """Create the table recording applied migrations if it doesn't exist."""
+    await conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            filename TEXT PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+
+async def applied_migrations(conn: asyncpg.Connection) -> set:
+    """File names of the migrations already recorded as applied."""
+    rows = await conn.fetch(f"SELECT filename FROM {MIGRATIONS_TABLE}")
+    return {row['filename'] for row in rows}
+
+async def record_migration(conn: asyncpg.Connection, migration_file: Path):
+    """Record a migration file as applied."""
+    await conn.execute(
+        f"INSERT INTO {MIGRATIONS_TABLE} (filename) VALUES ($1) "
+        f"ON CONFLICT (filename) DO UPDATE SET applied_at = NOW()",
+        migration_file.name
+    )
+
+async def run_migration(migration_file: Path, pool: Optional[asyncpg.Pool] = None,
+                        migration_sql: Optional[str] = None):
+    """Run a specific migration file, on a connection from pool if given.
     
+    migration_sql is the file's contents when the caller has already read it.
+    On success the file is recorded in the migrations table.
+    """
     if not migration_file.exists():
         logger.error("migration_file_not_found", path=str(migration_file))
         return False
     
     try:
-        # Connect to database
-        conn = await asyncpg.connect(**db_config)
-        logger.info("database_connected", host=db_config['host'], database=db_config['database'])
-        
-        # Read migration SQL
-        with open(migration_file, 'r') as f:
-            migration_sql = f.read()
+        if pool is None:
+            # Standalone use: connect just for this migration
+            db_config = get_db_config()
+            pool = await asyncpg.create_pool(**db_config, min_size=1, max_size=1)
+            logger.info("database_connected",
+                       host=db_config['host'], database=db_config['database'])
+            owns_pool = True
+        else:
+            owns_pool = False
         
-        # Execute migration
-        logger.info("running_migration", file=migration_file.name)
-        await conn.execute(migration_sql)
+        try:
+            # Read migration SQL off the event loop
+            if migration_sql is None:
+                migration_sql = await asyncio.to_thread(migration_file.read_text, encoding='utf-8')
+            
+            # Execute migration; without arguments asyncpg sends the whole script as
+            # one simple query, so all statements go in a single round trip, and the
+            # transaction makes a failed migration leave nothing half-applied
+            logger.info("running_migration", file=migration_file.name)
+            async with pool.acquire() as conn:
+                if owns_pool:
+                    await ensure_migrations_table(conn)
+                if starts_with_transaction(migration_sql):
+                    await conn.execute(migration_sql)
+                    await record_migration(conn, migration_file)
+                else:
+                    # Recorded in the same transaction, so it's only marked applied if it was
+                    async with conn.transaction():
+                        await conn.execute(migration_sql)
+                        await record_migration(conn, migration_file)
+        finally:
+            if owns_pool:
+                await pool.close()
         
         logger.info("migration_completed", file=migration_file.name)
         return True
@@ -49,19 +118,39 @@ async def run_migration(migration_file: Path):
     except Exception as e:
         logger.error("migration_failed", file=migration_file.name, error=str(e))
         return False
-        
-    finally:
-        if 'conn' in locals():
-            await conn.close()
+
+def migration_levels(migration_files: List[Path]) -> List[List[Path]]:
+    """Group migrations into levels that must be applied one after another.
+    
+    Files sharing a numeric prefix (001_, 002_, ...) are independent by
+    convention and form one level; levels are ordered by prefix. Files
+    without a prefix follow, one level each, in name order.
+    """
+    numbered: Dict[int, List[Path]] = {}
+    unnumbered: List[Path] = []
+    for path in migration_files:
+        match = _LEVEL_PREFIX_RE.match(path.name)
+        if match:
+            numbered.setdefault(int(match.group(1)), []).append(path)
+        else:
+            unnumbered.append(path)
+    
+    levels = [sorted(numbered[prefix]) for prefix in sorted(numbered)]
+    levels.extend([path] for path in sorted(unnumbered))
+    return levels
 
 async def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Run database migrations')
-    parser.add_argument('migration_file', type=Path, nargs='?',
-                        help='Path to migration SQL file')
+    parser.add_argument('migration_files', type=Path, nargs='*',
+                        help='Path(s) to migration SQL files, run in the order given')
     parser.add_argument('--list', action='store_true',
                         help='List available migrations')
+    parser.add_argument('--apply-all', action='store_true',
+                        help='Apply every migration in database/migrations not yet recorded in '
+                             f'{MIGRATIONS_TABLE}, running files that share a numeric prefix '
+                             'concurrently')
     
     args = parser.parse_args()
     
@@ -88,18 +177,78 @@ async def main():
             print("📭 No migrations directory found")
         return 0
     
-    if not args.migration_file:
-        # Default to the is_active migration
-        args.migration_file = migrations_dir / '001_add_is_active_column.sql'
+    if args.apply_all:
+        resolved = sorted(migrations_dir.glob('*.sql'))
+        if not resolved:
+            print("📭 No migrations to apply")
+            return 0
+    else:
+        migration_files: List[Path] = args.migration_files or [
+            # Default to the is_active migration
+            migrations_dir / '001_add_is_active_column.sql'
+        ]
+        
+        resolved = []
+        for migration_file in migration_files:
+            if not migration_file.is_absolute():
+                # Try relative to migrations directory
+                potential_path = migrations_dir / migration_file
+                if potential_path.exists():
+                    migration_file = potential_path
+            resolved.append(migration_file)
+    
+    missing = [str(path) for path in resolved if not path.exists()]
+    if missing:
+        logger.error("migration_file_not_found", paths=missing)
+        return 1
+    
+    # Read every file up front, concurrently and off the event loop
+    try:
+        scripts = await asyncio.gather(
+            *(asyncio.to_thread(path.read_text, encoding='utf-8') for path in resolved)
+        )
+    except OSError as e:
+        logger.error("migration_file_read_failed", error=str(e))
+        return 1
     
-    if not args.migration_file.is_absolute():
-        # Try relative to migrations directory
-        potential_path = migrations_dir / args.migration_file
-        if potential_path.exists():
-            args.migration_file = potential_path
+    sql_by_file = dict(zip(resolved, scripts))
     
-    success = await run_migration(args.migration_file)
-    return 0 if success else 1
+    # One pool for the whole run; connections open on demand, so it only grows to
+    # one per file in the widest level that actually runs
+    db_config = get_db_config()
+    try:
+        pool = await asyncpg.create_pool(**db_config, min_size=1, max_size=len(resolved))
+    except Exception as e:
+        logger.error("database_connection_failed", host=db_config['host'], error=str(e))
+        return 1
+    logger.info("database_connected", host=db_config['host'], database=db_config['database'])
+    
+    try:
+        async with pool.acquire() as conn:
+            await ensure_migrations_table(conn)
+            applied = await applied_migrations(conn) if args.apply_all else set()
+        
+        # Explicitly listed files always run, in the order given, since later files
+        # usually depend on earlier ones; --apply-all skips recorded files and runs
+        # each level's files concurrently
+        if args.apply_all:
+            pending = [path for path in resolved if path.name not in applied]
+            if not pending:
+                print("✅ All migrations already applied")
+                return 0
+            levels = migration_levels(pending)
+        else:
+            levels = [[path] for path in resolved]
+        
+        for level in levels:
+            results = await asyncio.gather(
+                *(run_migration(path, pool, sql_by_file[path]) for path in level)
+            )
+            if not all(results):
+                return 1
+    finally:
+        await pool.close()
+    return 0
 
 if __name__ == "__main__":
     exit(asyncio.run(main()))
\ No newline at end of file
@@ -5,169 +5,305 @@ Processes website screenshots for Making Tax Digital compliance using Agno agent
 """
 
 import asyncio
-import base64
 import csv
-import json
+import hashlib
 import os
-import sys
+import re
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 
 import asyncpg
+import orjson
 import structlog
 from dotenv import load_dotenv
 from agno.agent import Agent
 from agno.models.openai import OpenAILike
 
+try:
+    # SIMD base64 codec; same API as the stdlib module, several times faster
+    # on multi-megabyte screenshots
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 # Load environment variables
 load_dotenv()
 
 logger = structlog.get_logger()
 
+# JSON wrapped in a markdown code fence, as some models return it
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+# CSV report columns: the website summary with each AC's result, confidence
+# and explanation, then when and by which model it was analysed
+REPORT_FIELDS = (
+    ("job_id", "website_url", "overall_status", "total_passed", "total_failed", "total_suspect")
+    + tuple(
+        f"ac{ac_num}_{field}"
+        for ac_num in range(1, 11)
+        for field in ("result", "confidence", "explanation")
+    )
+    + ("analysis_timestamp", "ai_model_used")
+)
+
+# Per-website report row: the summary joined with its AC results, pivoted so
+# each AC's result, confidence and explanation become columns, selected in
+# REPORT_FIELDS order so rows can be written to the CSV as they come
+REPORT_QUERY = """
+    SELECT
+        s.job_id, s.website_url, s.overall_status,
+        s.total_passed, s.total_failed, s.total_suspect,
+        {ac_columns},
+        s.analysis_timestamp, s.ai_model_used
+    FROM mtd_compliance_summary s
+    LEFT JOIN mtd_ac_results r
+        ON r.job_id = s.job_id AND r.website_url = s.website_url AND r.is_active = TRUE
+    WHERE s.job_id = $1 AND s.is_active = TRUE
+    GROUP BY s.id
+    ORDER BY s.website_url
+""".format(
+    ac_columns=",\n        ".join(
+        f"MAX(r.ac_{field}) FILTER (WHERE r.ac_number = {ac_num}) AS ac{ac_num}_{field}"
+        for ac_num in range(1, 11)
+        for field in ("result", "confidence", "explanation")
+    )
+)
+
+# Report rows fetched per cursor round trip and written to the CSV together
+REPORT_BATCH_SIZE = 256
+
+# Retries for a website whose LLM call was rate limited (HTTP 429)
+RATE_LIMIT_RETRIES = 3
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Whether an exception from the model endpoint is a rate limit response."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message
+
 
 class MTDDatabaseTools:
     """Database tools for MTD compliance checking."""
 
-    def __init__(self, db_config: Dict[str, Any], source_table: str = "preprocessing_results"):
+    def __init__(
+        self,
+        db_config: Dict[str, Any],
+        source_table: str = "preprocessing_results",
+        screenshot_dir: Optional[Path] = None,
+    ):
         self.db_config = db_config
         self.source_table = source_table
-
-    async def create_connection(self) -> asyncpg.Connection:
-        """Create database connection."""
+        # Base directory for relative screenshot_path values
+        self.screenshot_dir = Path(screenshot_dir) if screenshot_dir else Path.cwd()
+        # Shared connection pool, created by init(); every query borrows a
+        # connection instead of opening (and authenticating) a new one
+        self.pool: Optional[asyncpg.Pool] = None
+
+    async def init(self):
+        """Create the connection pool if it isn't open yet."""
+        if self.pool is not None:
+            return
         try:
-            conn = await asyncpg.connect(**self.db_config)
-            return conn
+            self.pool = await asyncpg.create_pool(
+                **self.db_config, min_size=1, max_size=max(4, (os.cpu_count() or 1) * 2 + 1)
+            )
         except Exception as e:
             logger.error("database_connection_failed", error=str(e))
             raise
 
+    async def close(self):
+        """Close the connection pool."""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
     async def ensure_tables_exist(self):
         """Create MTD tables if they don't exist."""
-        conn = await self.create_connection()
-        try:
-            # Create normalized AC results table
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS mtd_ac_results (
-                    id SERIAL PRIMARY KEY,
-                    job_id VARCHAR(255) NOT NULL,
-                    website_url TEXT NOT NULL,
-                    ac_number INTEGER NOT NULL CHECK (ac_number >= 1 AND ac_number <= 10),
-                    ac_result VARCHAR(20) NOT NULL,
-                    ac_confidence VARCHAR(10),
-                    ac_explanation TEXT,
-                    analysis_timestamp TIMESTAMP DEFAULT NOW(),
-                    ai_model_used VARCHAR(100),
-                    created_date TIMESTAMP DEFAULT NOW(),
-                    last_updated_date TIMESTAMP DEFAULT NOW(),
-                    version_num INTEGER DEFAULT 1,
-                    is_active BOOLEAN DEFAULT TRUE,
-                    created_by VARCHAR(255) DEFAULT 'mtd_checker',
-                    last_updated_by VARCHAR(255) DEFAULT 'mtd_checker',
-                    remarks TEXT,
-                    UNIQUE(job_id, website_url, ac_number)
-                );
-                
-                CREATE INDEX IF NOT EXISTS idx_ac_results_job_id ON mtd_ac_results(job_id);
-                CREATE INDEX IF NOT EXISTS idx_ac_results_url ON mtd_ac_results(website_url);
-                CREATE INDEX IF NOT EXISTS idx_ac_results_ac_number ON mtd_ac_results(ac_number);
-                CREATE INDEX IF NOT EXISTS idx_ac_results_result ON mtd_ac_results(ac_result);
-            """
+        async with self.pool.acquire() as conn:
+            # The tables and their indexes are created together, so when both
+            # tables exist the DDL is skipped entirely
+            exists = await conn.fetchval(
+                "SELECT to_regclass('mtd_ac_results') IS NOT NULL "
+                "AND EXISTS (SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'mtd_compliance_summary' AND column_name = 'payload_hash')"
             )
-
-            # Create summary results table
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS mtd_compliance_summary (
-                    id SERIAL PRIMARY KEY,
-                    job_id VARCHAR(255) NOT NULL,
-                    website_url TEXT NOT NULL,
-                    overall_status VARCHAR(20),
-                    total_passed INTEGER DEFAULT 0,
-                    total_failed INTEGER DEFAULT 0,
-                    total_suspect INTEGER DEFAULT 0,
-                    analysis_timestamp TIMESTAMP DEFAULT NOW(),
-                    ai_model_used VARCHAR(100),
-                    created_date TIMESTAMP DEFAULT NOW(),
-                    last_updated_date TIMESTAMP DEFAULT NOW(),
-                    version_num INTEGER DEFAULT 1,
-                    is_active BOOLEAN DEFAULT TRUE,
-                    created_by VARCHAR(255) DEFAULT 'mtd_checker',
-                    last_updated_by VARCHAR(255) DEFAULT 'mtd_checker',
-                    remarks TEXT,
-                    UNIQUE(job_id, website_url)
-                );
+            if exists:
+                return
+
+            # Normalized AC results and summary tables, in one script and transaction
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS mtd_ac_results (
+                        id SERIAL PRIMARY KEY,
+                        job_id VARCHAR(255) NOT NULL,
+                        website_url TEXT NOT NULL,
+                        ac_number INTEGER NOT NULL CHECK (ac_number >= 1 AND ac_number <= 10),
+                        ac_result VARCHAR(20) NOT NULL,
+                        ac_confidence VARCHAR(10),
+                        ac_explanation TEXT,
+                        analysis_timestamp TIMESTAMP DEFAULT NOW(),
+                        ai_model_used VARCHAR(100),
+                        created_date TIMESTAMP DEFAULT NOW(),
+                        last_updated_date TIMESTAMP DEFAULT NOW(),
+                        version_num INTEGER DEFAULT 1,
+                        is_active BOOLEAN DEFAULT TRUE,
+                        created_by VARCHAR(255) DEFAULT 'mtd_checker',
+                        last_updated_by VARCHAR(255) DEFAULT 'mtd_checker',
+                        remarks TEXT,
+                        UNIQUE(job_id, website_url, ac_number)
+                    );
                 
-                CREATE INDEX IF NOT EXISTS idx_summary_job_id ON mtd_compliance_summary(job_id);
-                CREATE INDEX IF NOT EXISTS idx_summary_url ON mtd_compliance_summary(website_url);
-                CREATE INDEX IF NOT EXISTS idx_summary_status ON mtd_compliance_summary(overall_status);
-            """
-            )
+                    CREATE INDEX IF NOT EXISTS idx_ac_results_job_id ON mtd_ac_results(job_id);
+                    CREATE INDEX IF NOT EXISTS idx_ac_results_url ON mtd_ac_results(website_url);
+                    CREATE INDEX IF NOT EXISTS idx_ac_results_ac_number
+                        ON mtd_ac_results(ac_number);
+                    CREATE INDEX IF NOT EXISTS idx_ac_results_result ON mtd_ac_results(ac_result);
+
+                    CREATE TABLE IF NOT EXISTS mtd_compliance_summary (
+                        id SERIAL PRIMARY KEY,
+                        job_id VARCHAR(255) NOT NULL,
+                        website_url TEXT NOT NULL,
+                        overall_status VARCHAR(20),
+                        total_passed INTEGER DEFAULT 0,
+                        total_failed INTEGER DEFAULT 0,
+                        total_suspect INTEGER DEFAULT 0,
+                        analysis_timestamp TIMESTAMP DEFAULT NOW(),
+                        ai_model_used VARCHAR(100),
+                        created_date TIMESTAMP DEFAULT NOW(),
+                        last_updated_date TIMESTAMP DEFAULT NOW(),
+                        version_num INTEGER DEFAULT 1,
+                        is_active BOOLEAN DEFAULT TRUE,
+                        created_by VARCHAR(255) DEFAULT 'mtd_checker',
+                        last_updated_by VARCHAR(255) DEFAULT 'mtd_checker',
+                        remarks TEXT,
+                        payload_hash VARCHAR(40),
+                        UNIQUE(job_id, website_url)
+                    );
+
+                    -- Summary tables created before payload_hash was added
+                    ALTER TABLE mtd_compliance_summary
+                        ADD COLUMN IF NOT EXISTS payload_hash VARCHAR(40);
+                
+                    CREATE INDEX IF NOT EXISTS idx_summary_job_id
+                        ON mtd_compliance_summary(job_id);
+                    CREATE INDEX IF NOT EXISTS idx_summary_url
+                        ON mtd_compliance_summary(website_url);
+                    CREATE INDEX IF NOT EXISTS idx_summary_status
+                        ON mtd_compliance_summary(overall_status);
+                """
+                )
 
             logger.info("mtd_tables_ensured")
 
-        finally:
-            await conn.close()
-
     async def fetch_image_from_db(self, job_id: str, website_url: str) -> Optional[bytes]:
-        """Fetch screenshot image data from source table."""
-        conn = await self.create_connection()
-        try:
-            # Get screenshot_data BYTEA from source table
+        """Fetch screenshot image data from source table.
+
+        Falls back to the row's screenshot_path (relative paths are resolved
+        against screenshot_dir) when screenshot_data wasn't uploaded.
+        """
+        async with self.pool.acquire() as conn:
+            # Both columns in one round trip; the path is only used as a fallback
             result = await conn.fetchrow(
                 f"""
-                SELECT screenshot_data FROM {self.source_table} 
+                SELECT screenshot_data, screenshot_path FROM {self.source_table} 
                 WHERE job_id = $1 AND original_url = $2 AND is_active = TRUE
             """,
                 job_id,
                 website_url,
             )
 
-            if result and result["screenshot_data"]:
-                logger.info(
-                    "image_fetched_from_db", job_id=job_id, url=website_url, table=self.source_table
+        if result and result["screenshot_data"]:
+            logger.info(
+                "image_fetched_from_db", job_id=job_id, url=website_url, table=self.source_table
+            )
+            # asyncpg already returns BYTEA as bytes, so no copy is needed
+            return result["screenshot_data"]
+
+        if result and result["screenshot_path"]:
+            screenshot_path = Path(result["screenshot_path"])
+            if not screenshot_path.is_absolute():
+                screenshot_path = self.screenshot_dir / screenshot_path
+            try:
+                image_data = await asyncio.to_thread(screenshot_path.read_bytes)
+            except OSError as e:
+                logger.warning(
+                    "image_file_read_failed", job_id=job_id, url=website_url, error=str(e)
                 )
-                return bytes(result["screenshot_data"])
             else:
-                logger.warning(
-                    "image_not_found", job_id=job_id, url=website_url, table=self.source_table
+                logger.info(
+                    "image_fetched_from_file",
+                    job_id=job_id,
+                    url=website_url,
+                    path=str(screenshot_path),
                 )
-                return None
+                return image_data
 
-        finally:
-            await conn.close()
+        logger.warning("image_not_found", job_id=job_id, url=website_url, table=self.source_table)
+        return None
 
     async def save_ac_results(
         self, job_id: str, website_url: str, results: Dict[str, Any], ai_model: str
     ):
-        """Save individual AC results to normalized table."""
-        conn = await self.create_connection()
-        try:
-            # Calculate totals
-            total_passed = 0
-            total_failed = 0
-            total_suspect = 0
-
-            # Insert individual AC results
-            for ac_key in results.keys():
-                if ac_key.startswith("ac") and isinstance(results[ac_key], dict):
-                    ac_number = int(ac_key[2:])  # Extract number from 'ac1', 'ac2', etc.
-                    ac_data = results[ac_key]
-
-                    result_value = ac_data.get("result", "").lower()
-                    if result_value == "pass":
-                        total_passed += 1
-                    elif result_value == "fail":
-                        total_failed += 1
-                    elif result_value == "suspect":
-                        total_suspect += 1
-
-                    await conn.execute(
+        """Save individual AC results to normalized table.
+
+        Skipped when the website's active summary row came from an identical
+        payload (same model and AC values) and all of that payload's AC rows are
+        still active, e.g. when a job is re-run. The hash only applies to active
+        rows: a deactivated summary or missing AC rows are written again. AC rows
+        edited in place aren't detected.
+        """
+        payload_hash = hashlib.sha1(
+            orjson.dumps([ai_model, results], option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+        ac_rows = [
+            (
+                job_id,
+                website_url,
+                int(ac_key[2:]),  # Extract number from 'ac1', 'ac2', etc.
+                ac_data.get("result", ""),
+                ac_data.get("confidence", ""),
+                ac_data.get("explanation", ""),
+                ai_model,
+            )
+            for ac_key, ac_data in results.items()
+            if ac_key.startswith("ac") and isinstance(ac_data, dict)
+        ]
+
+        async with self.pool.acquire() as conn:
+            stored_hash = await conn.fetchval(
+                """
+                SELECT s.payload_hash FROM mtd_compliance_summary s
+                WHERE s.job_id = $1 AND s.website_url = $2 AND s.is_active = TRUE
+                    AND (
+                        SELECT COUNT(*) FROM mtd_ac_results r
+                        WHERE r.job_id = $1 AND r.website_url = $2 AND r.is_active = TRUE
+                            AND r.ac_number = ANY($3::int[])
+                    ) = $4
+            """,
+                job_id,
+                website_url,
+                [row[2] for row in ac_rows],
+                len({row[2] for row in ac_rows}),
+            )
+            if stored_hash == payload_hash:
+                logger.info("ac_results_unchanged", job_id=job_id, url=website_url)
+                return
+
+            # One transaction for the whole website; executemany pipelines the AC
+            # upserts instead of waiting on a round trip per row
+            async with conn.transaction():
+                if ac_rows:
+                    await conn.executemany(
                         """
                         INSERT INTO mtd_ac_results (
-                            job_id, website_url, ac_number, ac_result, ac_confidence, ac_explanation, ai_model_used
+                            job_id, website_url, ac_number, ac_result, ac_confidence,
+                            ac_explanation, ai_model_used
                         ) VALUES ($1, $2, $3, $4, $5, $6, $7)
                         ON CONFLICT (job_id, website_url, ac_number) DO UPDATE SET
                             ac_result = EXCLUDED.ac_result,
@@ -177,121 +313,121 @@ class MTDDatabaseTools:
                             last_updated_date = NOW(),
                             version_num = mtd_ac_results.version_num + 1
                     """,
-                        job_id,
-                        website_url,
-                        ac_number,
-                        ac_data.get("result", ""),
-                        ac_data.get("confidence", ""),
-                        ac_data.get("explanation", ""),
-                        ai_model,
+                        ac_rows,
                     )
 
-            # Determine overall status
-            if total_failed > 0 or total_suspect > 0:
-                overall_status = "Fail"
-            elif total_passed > 0:
-                overall_status = "Pass"
-            else:
-                overall_status = "Unknown"
-
-            # Insert summary
-            await conn.execute(
-                """
-                INSERT INTO mtd_compliance_summary (
-                    job_id, website_url, overall_status, 
-                    total_passed, total_failed, total_suspect, ai_model_used
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-                ON CONFLICT (job_id, website_url) DO UPDATE SET
-                    overall_status = EXCLUDED.overall_status,
-                    total_passed = EXCLUDED.total_passed,
-                    total_failed = EXCLUDED.total_failed,
-                    total_suspect = EXCLUDED.total_suspect,
-                    ai_model_used = EXCLUDED.ai_model_used,
-                    last_updated_date = NOW(),
-                    version_num = mtd_compliance_summary.version_num + 1
-            """,
-                job_id,
-                website_url,
-                overall_status,
-                total_passed,
-                total_failed,
-                total_suspect,
-                ai_model,
-            )
-
-            logger.info(
-                "ac_results_saved",
-                job_id=job_id,
-                url=website_url,
-                overall_status=overall_status,
-                passed=total_passed,
-                failed=total_failed,
-                suspect=total_suspect,
-            )
-
-        finally:
-            await conn.close()
-
-    async def query_summary_by_job_id(self, job_id: str) -> List[Dict[str, Any]]:
-        """Query summary results for a job_id."""
-        conn = await self.create_connection()
-        try:
-            rows = await conn.fetch(
-                """
-                SELECT * FROM mtd_compliance_summary 
-                WHERE job_id = $1 AND is_active = TRUE
-                ORDER BY website_url
-            """,
-                job_id,
-            )
-
-            results = [dict(row) for row in rows]
-            logger.info("summary_results_queried", job_id=job_id, count=len(results))
-            return results
-
-        finally:
-            await conn.close()
+                # Summary totals and status are derived from the stored rows for the
+                # ACs in this payload, so they agree with mtd_ac_results; rows left
+                # from an earlier analysis for ACs missing here aren't counted
+                summary = await conn.fetchrow(
+                    """
+                    WITH totals AS (
+                        SELECT
+                            COUNT(*) FILTER (WHERE lower(ac_result) = 'pass') AS passed,
+                            COUNT(*) FILTER (WHERE lower(ac_result) = 'fail') AS failed,
+                            COUNT(*) FILTER (WHERE lower(ac_result) = 'suspect') AS suspect
+                        FROM mtd_ac_results
+                        WHERE job_id = $1 AND website_url = $2 AND is_active = TRUE
+                            AND ac_number = ANY($5::int[])
+                    )
+                    INSERT INTO mtd_compliance_summary (
+                        job_id, website_url, overall_status, 
+                        total_passed, total_failed, total_suspect, ai_model_used, payload_hash
+                    )
+                    SELECT
+                        $1, $2,
+                        CASE
+                            WHEN failed > 0 OR suspect > 0 THEN 'Fail'
+                            WHEN passed > 0 THEN 'Pass'
+                            ELSE 'Unknown'
+                        END,
+                        passed, failed, suspect, $3, $4
+                    FROM totals
+                    ON CONFLICT (job_id, website_url) DO UPDATE SET
+                        overall_status = EXCLUDED.overall_status,
+                        total_passed = EXCLUDED.total_passed,
+                        total_failed = EXCLUDED.total_failed,
+                        total_suspect = EXCLUDED.total_suspect,
+                        ai_model_used = EXCLUDED.ai_model_used,
+                        payload_hash = EXCLUDED.payload_hash,
+                        last_updated_date = NOW(),
+                        version_num = mtd_compliance_summary.version_num + 1
+                    RETURNING overall_status, total_passed, total_failed, total_suspect
+                """,
+                    job_id,
+                    website_url,
+                    ai_model,
+                    payload_hash,
+                    [row[2] for row in ac_rows],
+                )
 
-    async def query_detailed_results_by_job_id(self, job_id: str) -> List[Dict[str, Any]]:
-        """Query detailed AC results for a job_id."""
-        conn = await self.create_connection()
-        try:
-            rows = await conn.fetch(
-                """
-                SELECT * FROM mtd_ac_results 
-                WHERE job_id = $1 AND is_active = TRUE
-                ORDER BY website_url, ac_number
-            """,
-                job_id,
-            )
+        logger.info(
+            "ac_results_saved",
+            job_id=job_id,
+            url=website_url,
+            overall_status=summary["overall_status"],
+            passed=summary["total_passed"],
+            failed=summary["total_failed"],
+            suspect=summary["total_suspect"],
+        )
 
-            results = [dict(row) for row in rows]
-            logger.info("detailed_results_queried", job_id=job_id, count=len(results))
-            return results
+    async def iter_report_batches_by_job_id(self, job_id: str) -> AsyncIterator[List[tuple]]:
+        """Stream the joined, pivoted report rows (one per website) for a job_id in batches.
 
-        finally:
-            await conn.close()
+        Rows are value tuples in REPORT_FIELDS order.
+        """
+        async with self.pool.acquire() as conn:
+            # Server-side cursors need a transaction; only one batch is held at a time
+            async with conn.transaction():
+                cursor = await conn.cursor(REPORT_QUERY, job_id)
+                while rows := await cursor.fetch(REPORT_BATCH_SIZE):
+                    yield [tuple(row) for row in rows]
 
 
 class CoordinatorAgent:
     """Orchestrates the MTD compliance workflow."""
 
-    def __init__(self, db_tools: MTDDatabaseTools, image_agent, reporting_agent):
+    def __init__(
+        self, db_tools: MTDDatabaseTools, image_agent, reporting_agent, concurrency: int = 8
+    ):
         self.db_tools = db_tools
         self.image_agent = image_agent
         self.reporting_agent = reporting_agent
+        self.concurrency = concurrency
 
     async def process_job(self, job_id: str, website_urls: List[str]) -> str:
         """Process a complete MTD compliance job."""
-        logger.info("coordinator_starting", job_id=job_id, url_count=len(website_urls))
+        logger.info(
+            "coordinator_starting",
+            job_id=job_id,
+            url_count=len(website_urls),
+            concurrency=self.concurrency,
+        )
 
-        # Process each website
-        for url in website_urls:
-            try:
-                await self.image_agent.analyze_website(job_id, url)
-                await asyncio.sleep(1)  # Rate limiting
-            except Exception as e:
-                logger.error("website_analysis_failed", job_id=job_id, url=url, error=str(e))
+        # Websites are independent, so up to `concurrency` are analysed at once
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def analyze(url: str):
+            async with semaphore:
+                for attempt in range(RATE_LIMIT_RETRIES + 1):
+                    try:
+                        await self.image_agent.analyze_website(job_id, url)
+                        return
+                    except Exception as e:
+                        if is_rate_limited(e) and attempt < RATE_LIMIT_RETRIES:
+                            # Back off only when the endpoint asks us to
+                            delay = 2**attempt
+                            logger.warning(
+                                "rate_limited", job_id=job_id, url=url, retry_in_s=delay
+                            )
+                            await asyncio.sleep(delay)
+                            continue
+                        logger.error(
+                            "website_analysis_failed", job_id=job_id, url=url, error=str(e)
+                        )
+                        return
+
+        await asyncio.gather(*(analyze(url) for url in website_urls))
 
         # Generate report
         report_path = await self.reporting_agent.generate_report(job_id)
@@ -303,27 +439,55 @@ class CoordinatorAgent:
 class SiteImageAnalysisAgent:
     """Performs MTD compliance checks on website screenshots."""
 
+    # Encoded data URLs kept for the most recently analysed screenshots, so a
+    # retried website (e.g. after a 429) isn't base64-encoded again; 0 disables
+    IMAGE_URL_CACHE_SIZE = 32
+
     def __init__(self, agent: Agent, db_tools: MTDDatabaseTools, model_id: str):
         self.agent = agent
         self.db_tools = db_tools
         self.model_id = model_id
+        self._image_urls: "OrderedDict[bytes, str]" = OrderedDict()
 
     def create_image_message(self, image_data: bytes) -> str:
-        """Create data URL for image."""
-        image_b64 = base64.b64encode(image_data).decode("utf-8")
-        return f"data:image/png;base64,{image_b64}"
-
-    def create_mtd_compliance_prompt(self, website_url: str) -> str:
-        """Create comprehensive MTD compliance check prompt."""
-        return f"""
+        """Create data URL for image, reusing a cached one for the same image content."""
+        if not self.IMAGE_URL_CACHE_SIZE:
+            return self._encode_image(image_data)
+
+        key = hashlib.blake2b(image_data, digest_size=16).digest()
+        image_url = self._image_urls.get(key)
+        if image_url is None:
+            image_url = self._encode_image(image_data)
+            self._image_urls[key] = image_url
+            if len(self._image_urls) > self.IMAGE_URL_CACHE_SIZE:
+                self._image_urls.popitem(last=False)
+        else:
+            self._image_urls.move_to_end(key)
+        return image_url
+
+    @staticmethod
+    def image_mime_type(image_data: bytes) -> str:
+        """MIME type of a screenshot from its magic bytes (PNG unless it's a JPEG)."""
+        if image_data[:3] == b"\xff\xd8\xff":
+            return "image/jpeg"
+        return "image/png"
+
+    @classmethod
+    def _encode_image(cls, image_data: bytes) -> str:
+        image_b64 = base64.b64encode(image_data).decode("ascii")
+        return f"data:{cls.image_mime_type(image_data)};base64,{image_b64}"
+
+    # The prompt is PROMPT_INSTRUCTIONS, the website URL, then PROMPT_RESPONSE_FORMAT.
+    # The instructions are identical for every website, so providers that cache
+    # prompt prefixes can reuse them; the output format still comes last
+    PROMPT_INSTRUCTIONS = """
 Analyze this website screenshot for Making Tax Digital (MTD) compliance. 
 
-WEBSITE URL: {website_url}
-
 Perform the following 10 acceptance criteria checks and return results in JSON format:
 
 AC1: HTTPS Compliance - Must be a HTTPS (secure encryption) web address
-AC2: Tax Product Link - Must provide link to the tax product with content relevant to service offered  
+AC2: Tax Product Link - Must provide link to the tax product with content relevant \
+to service offered  
 AC3: Privacy Statement - Must provide visible links to privacy statement
 AC4: Terms & Conditions - Must provide visible links to Terms & Conditions
 AC5: Functioning Website - Must be a fully functioning website (not partially constructed)
@@ -337,62 +501,71 @@ For each AC, provide:
 - result: Pass/Fail/Suspect
 - confidence: High/Medium/Low  
 - explanation: Brief reasoning (if result is Fail/Suspect)
+"""
 
+    PROMPT_RESPONSE_FORMAT = """
 RESPONSE FORMAT (JSON only, no other text):
-{{
-    "ac1": {{
+{
+    "ac1": {
         "result": "Pass/Fail",
         "confidence": "High/Medium/Low",
         "explanation": "Explanation if failed or suspect"
-    }},
-    "ac2": {{
+    },
+    "ac2": {
         "result": "Pass/Fail", 
         "confidence": "High/Medium/Low",
         "explanation": "Explanation if failed or suspect"
-    }},
-    "ac3": {{
+    },
+    "ac3": {
         "result": "Pass/Fail",
         "confidence": "High/Medium/Low", 
         "explanation": "Explanation if failed or suspect"
-    }},
-    "ac4": {{
+    },
+    "ac4": {
         "result": "Pass/Fail",
         "confidence": "High/Medium/Low",
         "explanation": "Explanation if failed or suspect"
-    }},
-    "ac5": {{
+    },
+    "ac5": {
         "result": "Pass/Fail",
         "confidence": "High/Medium/Low",
         "explanation": "Explanation if failed or suspect"
-    }},
-    "ac6": {{
+    },
+    "ac6": {
         "result": "Pass/Fail",
         "confidence": "High/Medium/Low", 
         "explanation": "Explanation if failed or suspect"
-    }},
-    "ac7": {{
+    },
+    "ac7": {
         "result": "Pass/Fail/Suspect",
         "confidence": "High/Medium/Low",
         "explanation": "Explanation if failed or suspect"
-    }},
-    "ac8": {{
+    },
+    "ac8": {
         "result": "Pass/Fail",
         "confidence": "High/Medium/Low",
         "explanation": "Explanation if failed or suspect"
-    }},
-    "ac9": {{
+    },
+    "ac9": {
         "result": "Pass/Fail",
         "confidence": "High/Medium/Low", 
         "explanation": "Explanation if failed or suspect"
-    }},
-    "ac10": {{
+    },
+    "ac10": {
         "result": "Pass/Fail",
         "confidence": "High/Medium/Low",
         "explanation": "Explanation if failed or suspect"
-    }}
-}}
+    }
+}
 """
 
+    def create_mtd_compliance_prompt(self, website_url: str) -> str:
+        """Create comprehensive MTD compliance check prompt."""
+        return (
+            f"{self.PROMPT_INSTRUCTIONS}\nWEBSITE URL: {website_url}\n"
+            f"{self.PROMPT_RESPONSE_FORMAT}"
+        )
+
     async def analyze_website(self, job_id: str, website_url: str):
         """Analyze a single website for MTD compliance."""
         logger.info("analyzing_website", job_id=job_id, url=website_url)
@@ -429,14 +602,12 @@ RESPONSE FORMAT (JSON only, no other text):
 
             # Try to parse JSON response
             try:
-                results = json.loads(content)
-            except json.JSONDecodeError:
+                results = orjson.loads(content)
+            except orjson.JSONDecodeError:
                 # Try to extract JSON from markdown
-                import re
-
-                json_match = re.search(r"```(?:json)?\s*(.*?)\s*```", content, re.DOTALL)
+                json_match = _JSON_FENCE_RE.search(content)
                 if json_match:
-                    results = json.loads(json_match.group(1).strip())
+                    results = orjson.loads(json_match.group(1).strip())
                 else:
                     logger.error("json_parse_failed", content=content[:500])
                     return
@@ -457,104 +628,41 @@ class ReportingAgent:
     def __init__(self, db_tools: MTDDatabaseTools):
         self.db_tools = db_tools
 
+    @staticmethod
+    def _open_report(output_file: Path):
+        """Create the CSV report file and write its header row."""
+        csvfile = open(output_file, "w", newline="", encoding="utf-8")
+        writer = csv.writer(csvfile)
+        writer.writerow(REPORT_FIELDS)
+        return csvfile, writer
+
     async def generate_report(self, job_id: str) -> str:
         """Generate CSV report for a job_id from normalized tables."""
         logger.info("generating_report", job_id=job_id)
 
-        # Query both summary and detailed results
-        summary_results = await self.db_tools.query_summary_by_job_id(job_id)
-        detailed_results = await self.db_tools.query_detailed_results_by_job_id(job_id)
-
-        if not summary_results:
-            logger.warning("no_results_found", job_id=job_id)
-            return None
-
-        # Organize detailed results by website_url
-        detailed_by_url = {}
-        for detail in detailed_results:
-            url = detail["website_url"]
-            if url not in detailed_by_url:
-                detailed_by_url[url] = {}
-            detailed_by_url[url][detail["ac_number"]] = detail
-
-        # Generate CSV report
         output_file = Path(
             f"./mtd_compliance_report_{job_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         )
+        # The query returns rows already in report shape. They're written in
+        # batches as the cursor streams them, in a worker thread so disk writes
+        # don't stall the event loop; the file is only created once there's a row
+        records = 0
+        csvfile = None
+        try:
+            async for batch in self.db_tools.iter_report_batches_by_job_id(job_id):
+                if csvfile is None:
+                    csvfile, writer = await asyncio.to_thread(self._open_report, output_file)
+                await asyncio.to_thread(writer.writerows, batch)
+                records += len(batch)
+        finally:
+            if csvfile is not None:
+                await asyncio.to_thread(csvfile.close)
 
-        with open(output_file, "w", newline="", encoding="utf-8") as csvfile:
-            fieldnames = [
-                "job_id",
-                "website_url",
-                "overall_status",
-                "total_passed",
-                "total_failed",
-                "total_suspect",
-                "ac1_result",
-                "ac1_confidence",
-                "ac1_explanation",
-                "ac2_result",
-                "ac2_confidence",
-                "ac2_explanation",
-                "ac3_result",
-                "ac3_confidence",
-                "ac3_explanation",
-                "ac4_result",
-                "ac4_confidence",
-                "ac4_explanation",
-                "ac5_result",
-                "ac5_confidence",
-                "ac5_explanation",
-                "ac6_result",
-                "ac6_confidence",
-                "ac6_explanation",
-                "ac7_result",
-                "ac7_confidence",
-                "ac7_explanation",
-                "ac8_result",
-                "ac8_confidence",
-                "ac8_explanation",
-                "ac9_result",
-                "ac9_confidence",
-                "ac9_explanation",
-                "ac10_result",
-                "ac10_confidence",
-                "ac10_explanation",
-                "analysis_timestamp",
-                "ai_model_used",
-            ]
-
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for summary in summary_results:
-                website_url = summary["website_url"]
-                website_details = detailed_by_url.get(website_url, {})
-
-                row = {
-                    "job_id": summary["job_id"],
-                    "website_url": website_url,
-                    "overall_status": summary["overall_status"],
-                    "total_passed": summary["total_passed"],
-                    "total_failed": summary["total_failed"],
-                    "total_suspect": summary["total_suspect"],
-                    "analysis_timestamp": summary["analysis_timestamp"],
-                    "ai_model_used": summary["ai_model_used"],
-                }
-
-                # Extract each AC result from normalized data
-                for ac_num in range(1, 11):
-                    ac_data = website_details.get(ac_num, {})
-
-                    row[f"ac{ac_num}_result"] = ac_data.get("ac_result", "")
-                    row[f"ac{ac_num}_confidence"] = ac_data.get("ac_confidence", "")
-                    row[f"ac{ac_num}_explanation"] = ac_data.get("ac_explanation", "")
-
-                writer.writerow(row)
+        if not records:
+            logger.warning("no_results_found", job_id=job_id)
+            return None
 
-        logger.info(
-            "report_generated", job_id=job_id, file=str(output_file), records=len(summary_results)
-        )
+        logger.info("report_generated", job_id=job_id, file=str(output_file), records=records)
         return str(output_file)
 
 
@@ -567,6 +675,8 @@ class MTDSiteChecker:
         api_key: str,
         base_url: str,
         source_table: str = "preprocessing_results",
+        concurrency: int = 8,
+        screenshot_dir: Optional[Path] = None,
     ):
         self.model_id = model_id
         self.source_table = source_table
@@ -586,25 +696,31 @@ class MTDSiteChecker:
         self.agent = Agent(model=self.model)
 
         # Initialize tools and agents
-        self.db_tools = MTDDatabaseTools(self.db_config, source_table)
+        self.db_tools = MTDDatabaseTools(self.db_config, source_table, screenshot_dir)
         self.image_agent = SiteImageAnalysisAgent(self.agent, self.db_tools, model_id)
         self.reporting_agent = ReportingAgent(self.db_tools)
-        self.coordinator = CoordinatorAgent(self.db_tools, self.image_agent, self.reporting_agent)
+        self.coordinator = CoordinatorAgent(
+            self.db_tools, self.image_agent, self.reporting_agent, concurrency
+        )
 
         logger.info("mtd_checker_initialized", model_id=model_id, source_table=source_table)
 
     async def setup_database(self):
-        """Ensure database tables exist."""
+        """Open the database pool and ensure tables exist."""
+        await self.db_tools.init()
         await self.db_tools.ensure_tables_exist()
 
+    async def close(self):
+        """Release database connections."""
+        await self.db_tools.close()
+
     async def run_mtd_analysis(self, job_id: str, website_urls: Optional[List[str]] = None) -> str:
         """Run MTD compliance analysis."""
         await self.setup_database()
 
         if website_urls is None:
             # Query all websites from source table for this job_id
-            conn = await self.db_tools.create_connection()
-            try:
+            async with self.db_tools.pool.acquire() as conn:
                 rows = await conn.fetch(
                     f"""
                     SELECT DISTINCT original_url FROM {self.source_table} 
@@ -612,9 +728,7 @@ class MTDSiteChecker:
                 """,
                     job_id,
                 )
-                website_urls = [row["original_url"] for row in rows]
-            finally:
-                await conn.close()
+            website_urls = [row["original_url"] for row in rows]
 
         if not website_urls:
             logger.error("no_websites_found", job_id=job_id, table=self.source_table)
@@ -649,6 +763,18 @@ async def main():
     parser.add_argument(
         "--urls", nargs="+", help="Website URLs to analyze (if not reading from database)"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.getenv("MTD_CONCURRENCY", "8")),
+        help="Websites analysed at once (default: $MTD_CONCURRENCY or 8)",
+    )
+    parser.add_argument(
+        "--screenshot-dir",
+        type=Path,
+        help="Directory relative screenshot paths are resolved against, for rows "
+        "uploaded without screenshot data (default: current directory)",
+    )
 
     args = parser.parse_args()
 
@@ -666,16 +792,21 @@ async def main():
             api_key=args.api_key,
             base_url=args.base_url,
             source_table=args.source_table,
+            concurrency=args.concurrency,
+            screenshot_dir=args.screenshot_dir,
         )
 
         # Generate job_id if not provided
         job_id = args.job_id or str(uuid.uuid4())
 
         # Run MTD analysis
-        report_path = await checker.run_mtd_analysis(job_id, args.urls)
+        try:
+            report_path = await checker.run_mtd_analysis(job_id, args.urls)
+        finally:
+            await checker.close()
 
         if report_path:
-            print(f"\n🎯 MTD Compliance Analysis Completed!")
+            print("\n🎯 MTD Compliance Analysis Completed!")
             print(f"📊 Job ID: {job_id}")
             print(f"📄 Report saved to: {report_path}")
             print(f"🔗 Download link: file://{Path(report_path).absolute()}")
@@ -692,4 +823,13 @@ async def main():
 
 
 if __name__ == "__main__":
-    exit(asyncio.run(main()))
+    loop_factory = None
+    try:
+        # Faster event loop for the LLM and Postgres I/O, when installed
+        import uvloop
+
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        pass
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        exit(runner.run(main()))
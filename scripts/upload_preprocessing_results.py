@@ -74,19 +74,30 @@ class PreprocessingResultsUploader:
             'user': os.getenv('POSTGRES_USER', 'postgres'),
             'password': os.getenv('POSTGRES_PASSWORD', ''),
         }
+        self.pool = None
     
-    async def create_connection(self) -> asyncpg.Connection:
-        """Create database connection."""
+    async def get_pool(self) -> asyncpg.Pool:
+        """Create the connection pool on first use, so repeated uploads reuse connections."""
+        if self.pool is not None:
+            return self.pool
         try:
-            conn = await asyncpg.connect(**self.db_config)
+            self.pool = await asyncpg.create_pool(
+                **self.db_config, min_size=2, max_size=8, max_inactive_connection_lifetime=300
+            )
             logger.info("database_connected", 
                        host=self.db_config['host'], 
                        database=self.db_config['database'])
-            return conn
+            return self.pool
         except Exception as e:
             logger.error("database_connection_failed", error=str(e), config=self.db_config)
             raise
     
+    async def close_pool(self):
+        """Close the connection pool, if one was created."""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+    
     def flatten_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Flatten a single result from nested JSON to flat dictionary.
@@ -219,14 +230,8 @@ CREATE INDEX IF NOT EXISTS idx_{self.table_name}_bot_detected ON {self.table_nam
 CREATE INDEX IF NOT EXISTS idx_{self.table_name}_job_id ON {self.table_name}(job_id);
 """
     
-    def generate_insert_sql(self) -> str:
-        """Generate INSERT SQL with ON CONFLICT handling."""
-        columns = [col_name for col_name, _ in self.SCHEMA_COLUMNS]
-        placeholders = ', '.join([f'${i+1}' for i in range(len(columns))])
-        
-        return f"""
-INSERT INTO {self.table_name} ({', '.join(columns)})
-VALUES ({placeholders})
+    # Upsert rule shared by single-row inserts and the bulk staging merge
+    ON_CONFLICT_SQL = """
 ON CONFLICT (job_id, original_url) DO UPDATE SET
     final_url = EXCLUDED.final_url,
     status = EXCLUDED.status,
@@ -236,54 +241,117 @@ ON CONFLICT (job_id, original_url) DO UPDATE SET
     created_at = CURRENT_TIMESTAMP
 """
     
+    def generate_insert_sql(self) -> str:
+        """Generate INSERT SQL with ON CONFLICT handling."""
+        columns = [col_name for col_name, _ in self.SCHEMA_COLUMNS]
+        placeholders = ', '.join([f'${i+1}' for i in range(len(columns))])
+        
+        return f"""
+INSERT INTO {self.table_name} ({', '.join(columns)})
+VALUES ({placeholders}){self.ON_CONFLICT_SQL}"""
+    
+    def generate_merge_sql(self, staging_table: str) -> str:
+        """Generate INSERT ... SELECT SQL merging a staging table, with the same ON CONFLICT handling."""
+        columns = ', '.join(col_name for col_name, _ in self.SCHEMA_COLUMNS)
+        
+        return f"""
+INSERT INTO {self.table_name} ({columns})
+SELECT {columns} FROM {staging_table}{self.ON_CONFLICT_SQL}"""
+    
+    async def copy_rows(self, connection: asyncpg.Connection, rows_data: List[List[Any]]):
+        """
+        Bulk upsert rows with binary COPY into a staging table, then one merge.
+        
+        COPY streams the rows (screenshot BYTEA included, as raw bytes) without a
+        round trip per row. The staging table is temporary and dropped on commit.
+        """
+        columns = [col_name for col_name, _ in self.SCHEMA_COLUMNS]
+        # Temporary tables live in their own schema, so drop any schema prefix
+        staging_table = f"{self.table_name.rsplit('.', 1)[-1]}_stage"
+        
+        # A single INSERT ... SELECT can't update the same row twice, so the last
+        # row for each (job_id, original_url) wins
+        rows_by_key = {(row[0], row[1]): row for row in rows_data}
+        
+        async with connection.transaction():
+            await connection.execute(f"""
+CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS
+SELECT {', '.join(columns)} FROM {self.table_name} WITH NO DATA
+""")
+            await connection.copy_records_to_table(
+                staging_table, records=rows_by_key.values(), columns=columns
+            )
+            await connection.execute(self.generate_merge_sql(staging_table))
+    
     async def create_table(self, connection: asyncpg.Connection):
         """Create table and indexes."""
         create_sql = self.generate_create_table_sql()
         await connection.execute(create_sql)
         logger.info("table_created", table=self.table_name)
     
-    async def upload_results(self, results: List[Dict[str, Any]]) -> int:
+    def build_rows(self, batch: List[Dict[str, Any]]) -> List[List[Any]]:
+        """Flatten a batch of results into rows in SCHEMA_COLUMNS order, loading screenshots."""
+        rows_data = []
+        for result in map(self.flatten_result, batch):
+            row = [result.get(col_name) for col_name, _ in self.SCHEMA_COLUMNS]
+            rows_data.append(row)
+            # Debug: log if screenshot_data is present
+            if result.get('screenshot_data'):
+                logger.info("inserting_with_screenshot", url=result.get('original_url'), size=len(result.get('screenshot_data')))
+            else:
+                logger.warning("no_screenshot_data_for_insert", url=result.get('original_url'))
+        return rows_data
+    
+    async def upload_results(self, results: List[Dict[str, Any]], batch_size: int = 500,
+                             concurrency: int = 4) -> int:
         """
         Upload results to PostgreSQL database.
         
         Args:
             results: List of result dictionaries from JSON
+            batch_size: Results flattened and uploaded together; at most
+                `concurrency` batches of screenshots are held in memory at a time
+            concurrency: Batches uploaded at once, each on its own pooled connection
             
         Returns:
             Number of rows inserted/updated
         """
-        connection = await self.create_connection()
+        pool = await self.get_pool()
         
-        try:
-            # Create table and indexes
+        # Create table and indexes
+        async with pool.acquire() as connection:
             await self.create_table(connection)
-            
-            # Prepare data
-            flattened_results = [self.flatten_result(result) for result in results]
-            insert_sql = self.generate_insert_sql()
-            
-            # Batch insert with conflict handling
-            rows_data = []
-            for result in flattened_results:
-                row = [result.get(col_name) for col_name, _ in self.SCHEMA_COLUMNS]
-                rows_data.append(row)
-                # Debug: log if screenshot_data is present
-                if result.get('screenshot_data'):
-                    logger.info("inserting_with_screenshot", url=result.get('original_url'), size=len(result.get('screenshot_data')))
-                else:
-                    logger.warning("no_screenshot_data_for_insert", url=result.get('original_url'))
-            
-            await connection.executemany(insert_sql, rows_data)
-            
-            logger.info("upload_completed", 
-                       rows_processed=len(rows_data),
-                       table=self.table_name)
-            
-            return len(rows_data)
-            
-        finally:
-            await connection.close()
-
+        
+        # Batches run concurrently, so a (job_id, original_url) repeated in two
+        # batches would race; keep only its last result up front
+        results = list({(r.get('job_id'), r.get('original_url')): r for r in results}.values())
+        semaphore = asyncio.Semaphore(min(concurrency, pool.get_max_size()))
+        
+        async def upload_batch(start: int) -> int:
+            async with semaphore:
+                # Screenshot files are read in a worker thread so other batches
+                # keep streaming meanwhile
+                batch = results[start:start + batch_size]
+                rows_data = await asyncio.to_thread(self.build_rows, batch)
+                
+                # Bulk insert with conflict handling
+                async with pool.acquire() as connection:
+                    await self.copy_rows(connection, rows_data)
+                logger.info("batch_uploaded", 
+                           batch_start=start,
+                           rows=len(rows_data),
+                           table=self.table_name)
+                return len(rows_data)
+        
+        rows_processed = sum(await asyncio.gather(
+            *(upload_batch(start) for start in range(0, len(results), batch_size))
+        ))
+        
+        logger.info("upload_completed", 
+                   rows_processed=rows_processed,
+                   table=self.table_name)
+        
+        return rows_processed
 
 def load_results_from_json(json_file_path: Path) -> List[Dict[str, Any]]:
     """Load results from preprocessing JSON file."""
@@ -355,6 +423,10 @@ Example:
                        help='Preview flattened data without uploading')
     parser.add_argument('--dry-run', action='store_true', 
                        help='Show SQL schema without uploading')
+    parser.add_argument('--batch-size', type=int, default=500,
+                       help='Results uploaded per batch (default: 500)')
+    parser.add_argument('--concurrency', type=int, default=4,
+                       help='Batches uploaded at once (default: 4)')
     
     args = parser.parse_args()
     
@@ -400,7 +472,7 @@ Example:
     
     # Actual upload
     try:
-        rows_processed = await uploader.upload_results(results)
+        rows_processed = await uploader.upload_results(results, args.batch_size, args.concurrency)
         print(f"✅ Successfully processed {rows_processed} results")
         print(f"📊 Data available in table: {args.table}")
         
@@ -408,6 +480,8 @@ Example:
         print(f"❌ Upload failed: {e}")
         logger.error("upload_failed", error=str(e))
         sys.exit(1)
+    finally:
+        await uploader.close_pool()
 
 
 if __name__ == "__main__":
@@ -89,7 +89,7 @@ class TestScraperIntegration:
         
         async with SiteScraper(temp_config) as scraper:
             # Patch the bot detector to simulate protection detection
-            with patch('preprocessing.scraper.BotDetector.detect_protection') as mock_detect:
+            with patch('preprocessing.scraper.BotDetector.detect_protection_bytes') as mock_detect:
                 mock_detect.return_value = BotProtectionInfo(
                     detected=True,
                     protection_type="cloudflare",
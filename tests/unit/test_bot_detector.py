@@ -301,6 +301,63 @@ class TestBotDetector:
         assert result_upper.protection_type == "cloudflare"
         assert result_mixed.protection_type == "cloudflare"
 
+    def test_is_block_page_by_status(self):
+        """Test that block statuses are recognised without inspecting HTML."""
+        assert BotDetector.is_block_page("", 403) is True
+        assert BotDetector.is_block_page("", 429) is True
+        assert BotDetector.is_block_page("<html></html>", 200) is False
+
+    def test_is_block_page_by_challenge_markup(self):
+        """Test that challenge interstitials are recognised from the page head."""
+        challenge = "<html><head><title>Attention Required! | Cloudflare</title></head></html>"
+        cdn_user = '<html><head><script src="https://cdnjs.cloudflare.com/x.js"></script></head></html>'
+
+        assert BotDetector.is_block_page(challenge, 200) is True
+        assert BotDetector.is_block_page(cdn_user, 200) is False
+
+    def test_mark_block_page_scores_undetected_page(self):
+        """Test that a block page with no HTML indicators gets a real type and confidence."""
+        plain = BotDetector.detect_protection("<html><body>Sorry</body></html>")
+        marked = BotDetector.mark_block_page(plain)
+        cloudflare = BotDetector.detect_protection("<title>Just a moment...</title> cf-ray")
+
+        assert plain.detected is False
+        assert marked.detected is True
+        assert marked.protection_type == "unknown"
+        assert marked.confidence > 0.3
+        assert marked.indicators == ["blocked_page"]
+        assert BotDetector.mark_block_page(cloudflare) is cloudflare
+
+    def test_fast_probe_covers_all_indicators(self):
+        """Test that every HTML indicator is reachable through the fast probe."""
+        for indicator, _ in BotDetector._HTML_INDICATOR_LABELS:
+            assert any(token in indicator for token in BotDetector._FAST_PROBE), indicator
+
+    def test_fast_probe_miss_skips_scan(self):
+        """Test that pages without any anchor token yield no indicators."""
+        html_content = "<html><head><title>Plain page</title></head><body><p>Hello</p></body></html>"
+
+        assert BotDetector._analyze_html_content(html_content) == []
+
+
+    def test_detect_protection_bytes_matches_str(self):
+        """Test that byte-level detection agrees with the string version."""
+        pages = [
+            "<html><head><title>Attention Required! | Cloudflare</title></head>"
+            "<body>Ray ID: 123 \u2014 Checking your browser</body></html>",
+            '<meta http-equiv="refresh" content="5"><p>Verify you are human (JS challenge)</p>',
+            "<html><body><p>Caf\u00e9 \u00fcber Too Many Requests</p></body></html>",
+            "<html><body><p>Nothing to see</p></body></html>",
+        ]
+
+        for page in pages:
+            expected = BotDetector.detect_protection(page, "HTTP 403")
+            result = BotDetector.detect_protection_bytes(page.encode("utf-8"), "HTTP 403")
+            assert sorted(result.indicators) == sorted(expected.indicators)
+            assert (result.detected, result.protection_type, result.confidence) == (
+                expected.detected, expected.protection_type, expected.confidence
+            )
+
 
 # Fixtures for common test data
 @pytest.fixture
@@ -30,6 +30,15 @@ class TestContentExtractor:
         domain = ContentExtractor.extract_domain(url)
         assert domain == ""  # Returns empty string for invalid URL
     
+    def test_extract_domain_is_cached(self):
+        """Test that repeated domain lookups are served from the cache."""
+        url = "https://cached.example.com/page"
+        ContentExtractor.extract_domain(url)
+        hits = ContentExtractor.extract_domain.cache_info().hits
+        
+        assert ContentExtractor.extract_domain(url) == "cached.example.com"
+        assert ContentExtractor.extract_domain.cache_info().hits == hits + 1
+    
     def test_extract_company_name_from_og_site_name(self):
         """Test company name extraction from OpenGraph site name."""
         html_content = """
@@ -81,6 +90,40 @@ class TestContentExtractor:
         company = ContentExtractor.extract_company_name(html_content, "https://example.com")
         assert company == "Best Company"
     
+    def test_clean_title_suffixes(self):
+        """Test that stacked suffixes are removed but hyphenated names are kept."""
+        assert ContentExtractor._clean_title("Acme | Official Site - Home") == "Acme"
+        assert ContentExtractor._clean_title("Acme - home  ") == "Acme"
+        assert ContentExtractor._clean_title("Mobile-Home") == "Mobile-Home"
+    
+    def test_extract_company_name_domain_fallback_only_strips_affixes(self):
+        """Test that the domain fallback only strips a leading www. and trailing TLD."""
+        html_content = "<html><head></head><body></body></html>"
+        
+        assert ContentExtractor.extract_company_name(html_content, "https://shop.com.au") == "Shop.Com.Au"
+        assert ContentExtractor.extract_company_name(html_content, "https://example.com:8080") == "Example:8080"
+    
+    def test_extract_company_name_og_attribute_order_and_entities(self):
+        """Test og:site_name with content before property and HTML entities."""
+        html_content = """
+        <html>
+        <head>
+            <meta content="Smith &amp; Sons" property="og:site_name">
+            <title>Welcome</title>
+        </head>
+        </html>
+        """
+
+        company = ContentExtractor.extract_company_name(html_content, "https://example.com")
+        assert company == "Smith & Sons"
+
+    def test_extract_company_name_falls_back_to_parser(self):
+        """Test that names beyond the regex window are still found by the parser."""
+        html_content = "<html><body>" + " " * 70000 + "<h1>Deep Heading Ltd</h1></body></html>"
+
+        company = ContentExtractor.extract_company_name(html_content, "https://example.com")
+        assert company == "Deep Heading Ltd"
+
     def test_extract_company_name_fallback_to_domain(self):
         """Test fallback to domain when no company name found."""
         html_content = "<html><head></head><body></body></html>"
@@ -98,6 +141,14 @@ class TestContentExtractor:
             # Should still work and extract from title
             assert company == "Test"
     
+    def test_extract_company_name_unparseable_uses_domain_fallback(self):
+        """Test that a document lxml rejects gets the same name as the domain fallback."""
+        with patch('preprocessing.content_extractor.logger') as mock_logger:
+            company = ContentExtractor.extract_company_name("<!-- empty -->", "https://www.test.com")
+        
+        assert company == "Test"
+        mock_logger.warning.assert_called_once()
+    
     def test_extract_metadata_complete(self):
         """Test complete metadata extraction."""
         html_content = """
@@ -207,6 +258,33 @@ class TestContentExtractor:
         hash3 = ContentExtractor.calculate_screenshot_hash(different_data)
         assert hash1 != hash3
     
+    def test_calculate_perceptual_hash(self):
+        """Test pHash matches near-duplicate screenshots but not different ones."""
+        from io import BytesIO
+        from PIL import Image, ImageDraw
+        
+        def render(text_x, fill="black", fmt="PNG"):
+            image = Image.new("RGB", (400, 300), "white")
+            draw = ImageDraw.Draw(image)
+            draw.rectangle([0, 0, 400, 60], fill=fill)
+            draw.rectangle([text_x, 120, text_x + 150, 200], fill="gray")
+            buffer = BytesIO()
+            image.save(buffer, fmt)
+            return buffer.getvalue()
+        
+        original = ContentExtractor.calculate_perceptual_hash(render(50))
+        assert len(original) == 16  # 64 bits
+        
+        # Re-encoding as JPEG changes every byte but not the picture
+        reencoded = ContentExtractor.calculate_perceptual_hash(render(50, fmt="JPEG"))
+        assert ContentExtractor.hamming_distance(original, reencoded) <= 2
+        
+        different = ContentExtractor.calculate_perceptual_hash(render(220, fill="navy"))
+        assert ContentExtractor.hamming_distance(original, different) > 2
+        
+        # Undecodable data is logged and skipped rather than raising
+        assert ContentExtractor.calculate_perceptual_hash(b"not an image") is None
+    
     def test_get_content_summary_basic(self):
         """Test basic content summary generation."""
         html_content = """
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the persistent scrape result cache.
+"""
+
+import pytest
+import time
+from unittest.mock import patch
+
+from preprocessing.scrape_cache import ScrapeCache
+from preprocessing.models import ScrapingConfig, ScrapingResult, SSLInfo, BotProtectionInfo
+
+
+class TestScrapeCache:
+    """Test cases for the ScrapeCache class."""
+    
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Fixture providing a scraping configuration in a temporary directory."""
+        return ScrapingConfig(job_id="new-job", output_dir=tmp_path)
+    
+    def make_result(self, url, status="success", html_path=None):
+        """Build a result as an earlier job would have stored it."""
+        return ScrapingResult(
+            job_id="old-job", original_url=url, final_url=url, domain="example.com",
+            company_name="Example", html_path=html_path, html_size=10, screenshot_path=None,
+            screenshot_hash=None, load_time_ms=1200, viewport_size="1920x1080",
+            redirected=False, ssl_info=SSLInfo(has_ssl=True, is_valid=True, issuer="CA"),
+            bot_protection=BotProtectionInfo(detected=True, indicators=["cf"]), status=status
+        )
+    
+    def test_round_trip_retags_job(self, config):
+        """Test that a stored success is returned intact under the new job id."""
+        cache = ScrapeCache(config.output_dir)
+        cache.put_many([self.make_result("https://a.com")], config)
+        
+        hits = cache.get_many(["https://a.com", "https://b.com"], config, ttl_s=60)
+        cache.close()
+        
+        assert list(hits) == ["https://a.com"]
+        result = hits["https://a.com"]
+        assert result.job_id == "new-job"
+        assert result.ssl_info == SSLInfo(has_ssl=True, is_valid=True, issuer="CA")
+        assert result.bot_protection.indicators == ["cf"]
+    
+    def test_failures_expired_and_missing_files_miss(self, config):
+        """Test that errors, stale rows and results with deleted files aren't served."""
+        cache = ScrapeCache(config.output_dir)
+        cache.put_many([
+            self.make_result("https://error.com", status="error"),
+            self.make_result("https://gone.com", html_path="html/ab/missing.html"),
+        ], config)
+        with patch('preprocessing.scrape_cache.time.time', return_value=time.time() - 120):
+            cache.put_many([self.make_result("https://stale.com")], config)
+        
+        hits = cache.get_many(
+            ["https://error.com", "https://gone.com", "https://stale.com"], config, ttl_s=60
+        )
+        cache.close()
+        
+        assert hits == {}
+    
+    @pytest.mark.parametrize("setting", [
+        {"viewport_width": 375, "viewport_height": 667},
+        {"user_agent": "Mobile"},
+        {"screenshot_mode": "viewport"},
+        {"screenshot_format": "jpeg"},
+        {"screenshot_quality": 50},
+        {"block_resources": {"image"}},
+        {"skip_assets": True},
+        {"wait_until": "load"},
+        {"settle_ms": 0},
+        {"compress_html": not ScrapingConfig.compress_html},
+    ])
+    def test_key_depends_on_capture_settings(self, config, setting):
+        """Test that different capture settings don't reuse another run's capture."""
+        other = ScrapingConfig(job_id="new-job", output_dir=config.output_dir, **setting)
+        
+        assert ScrapeCache.cache_key("https://a.com", config) != ScrapeCache.cache_key("https://a.com", other)
+    
+    def test_key_ignores_job_and_run_settings(self, config):
+        """Test that settings which don't change the capture still share entries."""
+        other = ScrapingConfig(job_id="other-job", output_dir=config.output_dir,
+                               timeout_ms=60000, max_concurrent=10)
+        
+        assert ScrapeCache.cache_key("https://a.com", config) == ScrapeCache.cache_key("https://a.com", other)
@@ -12,8 +12,9 @@ import tempfile
 from pathlib import Path
 from unittest.mock import patch, MagicMock, AsyncMock
 
-from preprocessing.scraper import SiteScraper
+from preprocessing.scraper import SiteScraper, _ContextQueue, _interleave_by_host
 from preprocessing.models import ScrapingConfig, ScrapingResult, SSLInfo, BotProtectionInfo
+from preprocessing.content_extractor import ContentExtractor
 
 
 class TestSiteScraper:
@@ -55,6 +56,7 @@ class TestSiteScraper:
         
         mock_playwright_instance.chromium.launch.return_value = mock_browser
         mock_browser.new_context.return_value = mock_context
+        mock_context.set_default_navigation_timeout = MagicMock()
         
         scraper = SiteScraper(mock_config)
         await scraper.start()
@@ -62,7 +64,55 @@ class TestSiteScraper:
         # Verify browser setup
         assert scraper.browser is not None
         assert scraper.context is not None
-        mock_browser.new_context.assert_called_once()
+        # One pooled context per concurrent navigation
+        assert mock_browser.new_context.call_count == mock_config.max_concurrent
+        mock_context.set_default_navigation_timeout.assert_called_with(mock_config.timeout_ms)
+        assert scraper._context_pool.qsize() == mock_config.max_concurrent
+    
+    @pytest.mark.asyncio
+    async def test_context_recycled_after_max_pages(self, mock_config):
+        """Test that a pooled context is replaced once it has served enough pages."""
+        mock_config.max_pages_per_context = 2
+        scraper = SiteScraper(mock_config)
+        
+        old_context = AsyncMock()
+        new_context = AsyncMock()
+        new_context.set_default_navigation_timeout = MagicMock()
+        scraper.browser = AsyncMock()
+        scraper.browser.new_context.return_value = new_context
+        scraper._contexts = [old_context]
+        scraper._context_pool = _ContextQueue()
+        scraper._context_pool.put_nowait(old_context)
+        scraper.context = old_context
+        
+        for _ in range(2):
+            context = await scraper._acquire_context("a.com")
+            await scraper._release_context(context, "a.com")
+        
+        old_context.close.assert_called_once()
+        assert "a.com" not in scraper._host_contexts
+        assert scraper._contexts == [new_context]
+        assert scraper.context is new_context
+        assert await scraper._acquire_context() is new_context
+    
+    @pytest.mark.asyncio
+    async def test_context_affinity_per_host(self, mock_config):
+        """Test that an idle context is handed back to the host it last served."""
+        scraper = SiteScraper(mock_config)
+        first, second = AsyncMock(), AsyncMock()
+        scraper._contexts = [first, second]
+        scraper._context_pool = _ContextQueue()
+        scraper._context_pool.put_nowait(first)
+        scraper._context_pool.put_nowait(second)
+        
+        context = await scraper._acquire_context("b.com")
+        assert context is first
+        await scraper._release_context(context, "b.com")
+        
+        # "b.com" gets its previous context even though another is queued first
+        assert await scraper._acquire_context("b.com") is first
+        # Unknown hosts (or a busy preferred context) take the next idle one
+        assert await scraper._acquire_context("b.com") is second
     
     @pytest.mark.asyncio
     async def test_scraper_close(self, mock_config):
@@ -83,6 +133,26 @@ class TestSiteScraper:
         assert scraper.context is None
         assert scraper.browser is None
     
+    @pytest.mark.asyncio
+    @patch('preprocessing.scraper.async_playwright')
+    async def test_shared_browser_not_launched_or_closed(self, mock_playwright, mock_config):
+        """Test that a caller-owned browser is used as is and left running."""
+        mock_browser = AsyncMock()
+        mock_context = AsyncMock()
+        mock_context.set_default_navigation_timeout = MagicMock()
+        mock_browser.new_context.return_value = mock_context
+        mock_config.screenshot_mode = "none"
+        
+        scraper = SiteScraper(mock_config, browser=mock_browser)
+        await scraper.start()
+        assert scraper.browser is mock_browser
+        await scraper.close()
+        
+        mock_playwright.assert_not_called()
+        mock_browser.close.assert_not_called()
+        assert mock_context.close.call_count == mock_config.max_concurrent
+        assert scraper.browser is None
+    
     @pytest.mark.asyncio
     async def test_async_context_manager(self, mock_config):
         """Test async context manager functionality."""
@@ -98,7 +168,7 @@ class TestSiteScraper:
     
     @pytest.mark.asyncio
     @patch('preprocessing.scraper.SSLChecker.check_certificate')
-    @patch('preprocessing.scraper.BotDetector.detect_protection')
+    @patch('preprocessing.scraper.BotDetector.detect_protection_bytes')
     @patch('preprocessing.scraper.ContentExtractor.extract_company_name')
     @patch('preprocessing.scraper.ContentExtractor.extract_domain')
     @patch('preprocessing.scraper.ContentExtractor.calculate_screenshot_hash')
@@ -119,6 +189,7 @@ class TestSiteScraper:
         
         mock_response = MagicMock()
         mock_response.status = 200
+        mock_response.security_details = AsyncMock(return_value=None)
         mock_page.goto.return_value = mock_response
         mock_page.url = "https://example.com/"
         mock_page.content.return_value = "<html><body>Test content</body></html>"
@@ -150,7 +221,247 @@ class TestSiteScraper:
     
     @pytest.mark.asyncio
     @patch('preprocessing.scraper.SSLChecker.check_certificate')
-    @patch('preprocessing.scraper.BotDetector.detect_protection')
+    async def test_scrape_url_uses_browser_security_details(self, mock_ssl_check, mock_config):
+        """Test that SSL info comes from the navigation response when available."""
+        mock_page = AsyncMock()
+        mock_context = AsyncMock()
+        mock_context.new_page.return_value = mock_page
+        
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.security_details = AsyncMock(return_value={
+            "issuer": "R3",
+            "subjectName": "example.com",
+            "protocol": "TLS 1.3",
+            "validFrom": 1700000000,
+            "validTo": 4102444800,  # 2100-01-01
+        })
+        mock_page.goto.return_value = mock_response
+        mock_page.url = "https://example.com/"
+        mock_page.content.return_value = "<html><head><title>Example Co</title></head></html>"
+        mock_page.screenshot.return_value = b"fake_screenshot_data"
+        
+        scraper = SiteScraper(mock_config)
+        scraper.context = mock_context
+        
+        result = await scraper.scrape_url("https://example.com")
+        
+        assert result.status == "success"
+        assert result.ssl_info.has_ssl is True
+        assert result.ssl_info.issuer == "R3"
+        assert result.ssl_info.subject == "example.com"
+        assert result.ssl_info.expires_date == "2100-01-01T00:00:00+00:00"
+        mock_ssl_check.assert_not_called()
+    
+    @pytest.mark.asyncio
+    @patch('preprocessing.scraper.SSLChecker.check_certificate')
+    async def test_load_time_excludes_slot_wait(self, mock_ssl_check, mock_config):
+        """Test that time spent queued for a scraping slot isn't counted as load time."""
+        mock_ssl_check.return_value = SSLInfo(has_ssl=True, is_valid=True)
+        mock_page = AsyncMock()
+        mock_context = AsyncMock()
+        mock_context.new_page.return_value = mock_page
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.security_details = AsyncMock(return_value=None)
+        mock_page.goto.return_value = mock_response
+        mock_page.url = "https://example.com"
+        mock_page.content.return_value = "<html><head><title>Example Co</title></head></html>"
+        mock_page.screenshot.return_value = b"fake_screenshot_data"
+        
+        scraper = SiteScraper(mock_config)
+        scraper.context = mock_context
+        scraper._net_semaphore = asyncio.Semaphore(1)
+        
+        async with scraper._net_semaphore:
+            task = asyncio.create_task(scraper.scrape_url("https://example.com"))
+            await asyncio.sleep(0.3)
+        result = await task
+        
+        assert result.status == "success"
+        assert result.load_time_ms < 200
+    
+    @pytest.mark.asyncio
+    @patch('preprocessing.scraper.SSLChecker.check_certificate')
+    async def test_scrape_url_skips_screenshot_for_block_page(self, mock_ssl_check, mock_config):
+        """Test that block responses are not screenshotted but still succeed."""
+        mock_ssl_check.return_value = SSLInfo(has_ssl=True, is_valid=True)
+        
+        mock_page = AsyncMock()
+        mock_context = AsyncMock()
+        mock_context.new_page.return_value = mock_page
+        
+        mock_response = MagicMock()
+        mock_response.status = 403
+        mock_response.security_details = AsyncMock(return_value=None)
+        mock_page.goto.return_value = mock_response
+        mock_page.url = "https://blocked.example.com/"
+        mock_page.content.return_value = "<html><body>Sorry</body></html>"
+        
+        scraper = SiteScraper(mock_config)
+        scraper.context = mock_context
+        
+        result = await scraper.scrape_url("https://blocked.example.com")
+        
+        assert result.status == "success"
+        assert result.screenshot_path is None
+        assert result.screenshot_hash is None
+        assert result.html_path is not None
+        assert result.bot_protection.detected is True
+        assert result.bot_protection.protection_type == "unknown"
+        assert result.bot_protection.confidence > 0.3
+        assert "blocked_page" in result.bot_protection.indicators
+        mock_page.screenshot.assert_not_called()
+    
+    @pytest.mark.asyncio
+    @patch('preprocessing.scraper.SSLChecker.check_certificate')
+    async def test_scrape_url_screenshot_mode_none(self, mock_ssl_check, mock_config):
+        """Test that screenshot_mode='none' captures HTML without a screenshot."""
+        mock_ssl_check.return_value = SSLInfo(has_ssl=True, is_valid=True)
+        mock_config.screenshot_mode = "none"
+        
+        mock_page = AsyncMock()
+        mock_context = AsyncMock()
+        mock_context.new_page.return_value = mock_page
+        
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.security_details = AsyncMock(return_value=None)
+        mock_page.goto.return_value = mock_response
+        mock_page.url = "https://example.com/"
+        mock_page.content.return_value = "<html><head><title>Example Ltd</title></head></html>"
+        
+        scraper = SiteScraper(mock_config)
+        scraper.context = mock_context
+        
+        result = await scraper.scrape_url("https://example.com")
+        
+        assert result.status == "success"
+        assert result.screenshot_path is None
+        assert result.html_path is not None
+        mock_page.screenshot.assert_not_called()
+    
+    @pytest.mark.asyncio
+    @patch('preprocessing.scraper.SSLChecker.check_certificate')
+    async def test_scrape_url_jpeg_viewport_screenshot(self, mock_ssl_check, mock_config):
+        """Test that JPEG viewport screenshots are requested and stored as .jpg."""
+        mock_ssl_check.return_value = SSLInfo(has_ssl=True, is_valid=True)
+        mock_config.screenshot_mode = "viewport"
+        mock_config.screenshot_format = "jpeg"
+        mock_config.screenshot_quality = 70
+        
+        mock_page = AsyncMock()
+        mock_context = AsyncMock()
+        mock_context.new_page.return_value = mock_page
+        
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.security_details = AsyncMock(return_value=None)
+        mock_page.goto.return_value = mock_response
+        mock_page.url = "https://example.com/"
+        mock_page.content.return_value = "<html><head><title>Example Ltd</title></head></html>"
+        mock_page.screenshot.return_value = b"fake_jpeg_data"
+        
+        scraper = SiteScraper(mock_config)
+        scraper.context = mock_context
+        
+        result = await scraper.scrape_url("https://example.com")
+        
+        mock_page.screenshot.assert_called_once_with(full_page=False, type="jpeg", quality=70)
+        assert result.screenshot_path.endswith(".jpg")
+    
+    @pytest.mark.asyncio
+    @patch('preprocessing.scraper.SSLChecker.check_certificate')
+    async def test_scrape_url_reuses_pooled_page(self, mock_ssl_check, mock_config):
+        """Test that a clean scrape parks its page for the next URL on that context."""
+        mock_ssl_check.return_value = SSLInfo(has_ssl=True, is_valid=True)
+        
+        mock_page = AsyncMock()
+        mock_context = AsyncMock()
+        mock_context.new_page.return_value = mock_page
+        
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.security_details = AsyncMock(return_value=None)
+        mock_page.goto.return_value = mock_response
+        mock_page.url = "https://example.com/"
+        mock_page.content.return_value = "<html><head><title>Example Ltd</title></head></html>"
+        mock_page.screenshot.return_value = b"fake_screenshot_data"
+        
+        scraper = SiteScraper(mock_config)
+        scraper.context = mock_context
+        scraper._contexts = [mock_context]
+        scraper._context_pool = asyncio.Queue()
+        scraper._context_pool.put_nowait(mock_context)
+        
+        await scraper.scrape_url("https://example.com")
+        await scraper.scrape_url("https://example.com")
+        
+        mock_context.new_page.assert_called_once()
+        mock_page.close.assert_not_called()
+        mock_page.goto.assert_any_call("about:blank")
+    
+    @pytest.mark.asyncio
+    @patch('preprocessing.scraper.SSLChecker.check_certificate')
+    async def test_scrape_url_settle_timeout_is_not_an_error(self, mock_ssl_check, mock_config):
+        """Test that a slow load event after domcontentloaded doesn't fail the scrape."""
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        mock_ssl_check.return_value = SSLInfo(has_ssl=True, is_valid=True)
+        
+        mock_page = AsyncMock()
+        mock_context = AsyncMock()
+        mock_context.new_page.return_value = mock_page
+        
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_response.security_details = AsyncMock(return_value=None)
+        mock_page.goto.return_value = mock_response
+        mock_page.wait_for_load_state.side_effect = PlaywrightTimeoutError("load timeout")
+        mock_page.url = "https://example.com/"
+        mock_page.content.return_value = "<html><head><title>Example Ltd</title></head></html>"
+        mock_page.screenshot.return_value = b"fake_screenshot_data"
+        
+        scraper = SiteScraper(mock_config)
+        scraper.context = mock_context
+        
+        result = await scraper.scrape_url("https://example.com")
+        
+        assert result.status == "success"
+        mock_page.goto.assert_called_once_with(
+            "https://example.com", timeout=mock_config.timeout_ms, wait_until="domcontentloaded"
+        )
+        mock_page.wait_for_load_state.assert_called_once_with("load", timeout=mock_config.settle_ms)
+    
+    def test_skip_assets_depends_on_screenshot_mode(self, mock_config):
+        """Test that skip_assets blocks more when no screenshot is taken."""
+        mock_config.skip_assets = True
+        assert SiteScraper(mock_config)._blocked_resources == {"media", "font"}
+        
+        mock_config.screenshot_mode = "none"
+        assert SiteScraper(mock_config)._blocked_resources == {"image", "media", "font", "stylesheet"}
+    
+    @pytest.mark.asyncio
+    async def test_route_blocks_configured_resource_types(self, mock_config):
+        """Test that the route handler aborts only blocked resource types."""
+        mock_config.block_resources = {"image", "font"}
+        scraper = SiteScraper(mock_config)
+        
+        image_route = AsyncMock()
+        image_route.request.resource_type = "image"
+        document_route = AsyncMock()
+        document_route.request.resource_type = "document"
+        
+        await scraper._route_blocked_resources(image_route)
+        await scraper._route_blocked_resources(document_route)
+        
+        image_route.abort.assert_called_once()
+        image_route.continue_.assert_not_called()
+        document_route.continue_.assert_called_once()
+        document_route.abort.assert_not_called()
+    
+    @pytest.mark.asyncio
+    @patch('preprocessing.scraper.SSLChecker.check_certificate')
+    @patch('preprocessing.scraper.BotDetector.detect_protection_bytes')
     async def test_scrape_url_timeout(self, mock_bot_detect, mock_ssl_check, mock_config):
         """Test URL scraping with timeout."""
         # Setup mocks
@@ -178,11 +489,19 @@ class TestSiteScraper:
     
     @pytest.mark.asyncio
     @patch('preprocessing.scraper.SSLChecker.check_certificate')
-    @patch('preprocessing.scraper.BotDetector.detect_protection')
+    @patch('preprocessing.scraper.BotDetector.detect_protection_bytes')
     async def test_scrape_url_error(self, mock_bot_detect, mock_ssl_check, mock_config):
         """Test URL scraping with general error."""
         # Setup mocks
-        mock_ssl_check.return_value = SSLInfo(has_ssl=False, is_valid=False, certificate_error="Connection failed")
+        free_slots = []
+        
+        async def check_certificate(url):
+            # The fallback check runs after the page's scraping slot is released
+            free_slots.append(scraper._net_semaphore._value)
+            mock_page.close.assert_called_once()
+            return SSLInfo(has_ssl=False, is_valid=False, certificate_error="Connection failed")
+        
+        mock_ssl_check.side_effect = check_certificate
         mock_bot_detect.return_value = BotProtectionInfo(detected=False)
         
         # Mock Playwright error
@@ -201,6 +520,7 @@ class TestSiteScraper:
         assert result.status == "error"
         assert result.error_message == "Network error"
         assert result.ssl_info.certificate_error == "Connection failed"
+        assert free_slots == [mock_config.max_concurrent]
     
     def test_load_html_content_success(self, mock_config):
         """Test successful HTML content loading."""
@@ -235,6 +555,94 @@ class TestSiteScraper:
         loaded_html = scraper.load_html_content(result)
         assert loaded_html == test_html
     
+    def test_postprocess_stores_compressed_html(self, mock_config):
+        """Test that HTML is stored zstd-compressed and loads back unchanged."""
+        mock_config.compress_html = True
+        scraper = SiteScraper(mock_config)
+        test_html = "<html><head><title>Example Ltd</title></head><body>" + "x" * 5000 + "</body></html>"
+        
+        _, _, html_path, html_size, _, _, _ = scraper._postprocess(
+            test_html, None, "https://example.com"
+        )
+        
+        assert html_path.endswith(".html.zst")
+        digest = html_path.rsplit("/", 1)[1].split(".", 1)[0]
+        assert html_path == f"html/{digest[:2]}/{digest}.html.zst"
+        assert html_size == len(test_html.encode("utf-8"))
+        assert (mock_config.output_dir / html_path).stat().st_size < html_size
+        
+        result = ScrapingResult(
+            job_id="test", original_url="https://example.com", final_url="https://example.com",
+            domain="example.com", company_name="Example Ltd", html_path=html_path,
+            html_size=html_size, screenshot_path=None, screenshot_hash=None,
+            load_time_ms=1000, viewport_size="1920x1080", redirected=False,
+            ssl_info=SSLInfo(has_ssl=True, is_valid=True),
+            bot_protection=BotProtectionInfo(detected=False), status="success"
+        )
+        assert scraper.load_html_content(result) == test_html
+    
+    def test_postprocess_in_parse_pool(self, mock_config):
+        """Test that HTML analysis and pHash give the same results in a process pool."""
+        import concurrent.futures
+        from io import BytesIO
+        from PIL import Image
+        scraper = SiteScraper(mock_config)
+        test_html = "<html><head><title>Pooled Ltd</title></head><body></body></html>"
+        buffer = BytesIO()
+        Image.new("RGB", (64, 48), "teal").save(buffer, "PNG")
+        screenshot = buffer.getvalue()
+        
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as pool:
+            scraper._parse_pool = pool
+            bot_protection, company_name, *_, screenshot_phash = scraper._postprocess(
+                test_html, screenshot, "https://example.com", blocked=True
+            )
+        
+        assert company_name == "Pooled Ltd"
+        assert bot_protection.detected is True
+        assert screenshot_phash == ContentExtractor.calculate_perceptual_hash(screenshot)
+    
+    def test_phash_cache_skips_rehashing_across_runs(self, mock_config):
+        """Test that a rerun reuses the persisted perceptual hash."""
+        from io import BytesIO
+        from PIL import Image
+        buffer = BytesIO()
+        Image.new("RGB", (64, 48), "olive").save(buffer, "PNG")
+        screenshot = buffer.getvalue()
+        html = "<html><head><title>Cached Ltd</title></head></html>"
+        
+        first = SiteScraper(mock_config)
+        first._open_phash_cache()
+        *_, phash = first._postprocess(html, screenshot, "https://example.com")
+        first._phash_db.close()
+        
+        second = SiteScraper(mock_config)
+        second._open_phash_cache()
+        with patch('preprocessing.scraper.ContentExtractor.calculate_perceptual_hash') as mock_phash:
+            *_, cached = second._postprocess(html, screenshot, "https://example.com")
+        second._phash_db.close()
+        
+        mock_phash.assert_not_called()
+        assert cached == phash is not None
+        assert mock_config.output_dir.joinpath(".phash_cache.db").exists()
+    
+    def test_store_content_addressed_skips_known_objects(self, mock_config):
+        """Test that repeated content is neither re-encoded nor re-written."""
+        scraper = SiteScraper(mock_config)
+        encode = MagicMock(return_value=b"payload")
+        
+        first = scraper._store_content_addressed("html", "abcdef", ".html.zst", encode)
+        second = scraper._store_content_addressed("html", "abcdef", ".html.zst", encode)
+        
+        assert first == second == "html/ab/abcdef.html.zst"
+        assert (mock_config.output_dir / first).read_bytes() == b"payload"
+        encode.assert_called_once()
+        
+        # A fresh scraper finds the existing file on disk and still skips encoding
+        other = SiteScraper(mock_config)
+        other._store_content_addressed("html", "abcdef", ".html.zst", encode)
+        encode.assert_called_once()
+    
     def test_load_html_content_missing_file(self, mock_config):
         """Test HTML content loading with missing file."""
         scraper = SiteScraper(mock_config)
@@ -317,6 +725,150 @@ class TestSiteScraper:
         # Verify results were stored
         assert len(scraper.results) == 2
     
+    def test_interleave_by_host(self):
+        """Test that URL indices are ordered round-robin across hosts."""
+        urls = ["https://a.com/1", "https://a.com/2", "a.com/3", "https://b.com/1", "https://c.com/1"]
+        
+        assert _interleave_by_host(urls) == [0, 3, 4, 1, 2]
+    
+    @pytest.mark.asyncio
+    async def test_scrape_urls_preserves_input_order(self, mock_config):
+        """Test that results come back in input order despite interleaved scheduling."""
+        scraper = SiteScraper(mock_config)
+        test_urls = ["https://a.com/1", "https://a.com/2", "https://b.com/1"]
+        
+        async def fake_scrape(url):
+            return ScrapingResult(
+                job_id="test-job", original_url=url, final_url=url, domain="test.com",
+                company_name="Test", html_path=None, html_size=0, screenshot_path=None,
+                screenshot_hash=None, load_time_ms=1000, viewport_size="1920x1080",
+                redirected=False, ssl_info=SSLInfo(has_ssl=True, is_valid=True),
+                bot_protection=BotProtectionInfo(detected=False), status="success"
+            )
+        
+        with patch.object(scraper, 'scrape_url', side_effect=fake_scrape) as mock_scrape:
+            with patch.object(scraper, 'start', new=AsyncMock()):
+                results = await scraper.scrape_urls(test_urls)
+        
+        assert [r.original_url for r in results] == test_urls
+        assert [c.args[0] for c in mock_scrape.call_args_list] == [
+            "https://a.com/1", "https://b.com/1", "https://a.com/2"
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_scrape_urls_consumes_iterator_and_records_failures(self, mock_config):
+        """Test that an iterator is fed through the workers and failed tasks become errors."""
+        scraper = SiteScraper(mock_config)
+        test_urls = [f"https://site{i}.com" for i in range(50)]
+        
+        async def fake_scrape(url):
+            if url == "https://site7.com":
+                raise RuntimeError("boom")
+            await asyncio.sleep(0)
+            return ScrapingResult(
+                job_id="test-job", original_url=url, final_url=url, domain="test.com",
+                company_name="Test", html_path=None, html_size=0, screenshot_path=None,
+                screenshot_hash=None, load_time_ms=1000, viewport_size="1920x1080",
+                redirected=False, ssl_info=SSLInfo(has_ssl=True, is_valid=True),
+                bot_protection=BotProtectionInfo(detected=False), status="success"
+            )
+        
+        with patch.object(scraper, 'scrape_url', side_effect=fake_scrape):
+            with patch.object(scraper, 'start', new=AsyncMock()):
+                results = await scraper.scrape_urls(iter(test_urls))
+        
+        assert [r.original_url for r in results] == test_urls
+        assert results[7].status == "error"
+        assert results[7].error_message == "boom"
+        assert len(scraper.results) == 49
+    
+    @pytest.mark.asyncio
+    async def test_iter_scrape_yields_in_completion_order(self, mock_config):
+        """Test that results are yielded as they finish, tagged with their input index."""
+        scraper = SiteScraper(mock_config)
+        delays = {"https://slow.com": 0.05, "https://fast.com": 0}
+        
+        async def fake_scrape(url):
+            await asyncio.sleep(delays[url])
+            return ScrapingResult(
+                job_id="test-job", original_url=url, final_url=url, domain="test.com",
+                company_name="Test", html_path=None, html_size=0, screenshot_path=None,
+                screenshot_hash=None, load_time_ms=1000, viewport_size="1920x1080",
+                redirected=False, ssl_info=SSLInfo(has_ssl=True, is_valid=True),
+                bot_protection=BotProtectionInfo(detected=False), status="success"
+            )
+        
+        with patch.object(scraper, 'scrape_url', side_effect=fake_scrape):
+            with patch.object(scraper, 'start', new=AsyncMock()):
+                pairs = [(i, r.original_url) async for i, r in scraper.iter_scrape(list(delays))]
+        
+        assert pairs == [(1, "https://fast.com"), (0, "https://slow.com")]
+    
+    @pytest.mark.asyncio
+    async def test_scrape_urls_streams_results_jsonl(self, mock_config):
+        """Test that each completed result is appended to the JSONL stream."""
+        scraper = SiteScraper(mock_config)
+        scraper._results_stream = open(scraper.results_stream_path, 'ab', buffering=0)
+        
+        test_urls = ["https://test1.com", "https://test2.com"]
+        mock_results = [
+            ScrapingResult(
+                job_id="test-job", original_url=url, final_url=url, domain="test.com",
+                company_name="Test", html_path=None, html_size=0, screenshot_path=None,
+                screenshot_hash=None, load_time_ms=1000, viewport_size="1920x1080",
+                redirected=False, ssl_info=SSLInfo(has_ssl=True, is_valid=True),
+                bot_protection=BotProtectionInfo(detected=False), status="success"
+            ) for url in test_urls
+        ]
+        
+        with patch.object(scraper, 'scrape_url', side_effect=mock_results):
+            with patch.object(scraper, 'start', new=AsyncMock()):
+                await scraper.scrape_urls(test_urls)
+        await scraper.close()
+        
+        lines = scraper.results_stream_path.read_text().splitlines()
+        assert [json.loads(line)["original_url"] for line in lines] == test_urls
+    
+    def test_rewrite_results_stream_replaces_earlier_lines(self, mock_config):
+        """Test that rewriting the JSONL stream keeps exactly the merged results, in order."""
+        scraper = SiteScraper(mock_config)
+        scraper.results_stream_path.write_text('{"original_url": "https://stale.com"}\n')
+        scraper.results = [
+            ScrapingResult(
+                job_id="test-job", original_url=url, final_url=url, domain="test.com",
+                company_name="Test", html_path=None, html_size=0, screenshot_path=None,
+                screenshot_hash=None, load_time_ms=1000, viewport_size="1920x1080",
+                redirected=False, ssl_info=SSLInfo(has_ssl=True, is_valid=True),
+                bot_protection=BotProtectionInfo(detected=False), status="success"
+            ) for url in ["https://b.com", "https://a.com"]
+        ]
+        
+        path = scraper.rewrite_results_stream()
+        
+        lines = path.read_text().splitlines()
+        assert [json.loads(line)["original_url"] for line in lines] == ["https://b.com", "https://a.com"]
+        assert list(mock_config.output_dir.glob(".*.tmp")) == []
+    
+    def test_save_manifest(self, mock_config):
+        """Test that the manifest lists each referenced object once."""
+        scraper = SiteScraper(mock_config)
+        scraper.results = [
+            ScrapingResult(
+                job_id="test-job", original_url=url, final_url=url, domain="test.com",
+                company_name="Test", html_path="html/ab/abc123.html.zst", html_size=100,
+                screenshot_path="screenshots/de/def456.png", screenshot_hash="def456",
+                load_time_ms=1000, viewport_size="1920x1080", redirected=False,
+                ssl_info=SSLInfo(has_ssl=True, is_valid=True),
+                bot_protection=BotProtectionInfo(detected=False), status="success"
+            ) for url in ["https://test1.com", "https://test2.com"]
+        ]
+        
+        manifest_path = scraper.save_manifest()
+        
+        assert manifest_path.name == "test-job_manifest.json"
+        manifest = json.loads(manifest_path.read_text())
+        assert manifest == {"job_id": "test-job", "html": ["abc123"], "screenshots": ["def456"]}
+    
     def test_save_results_json(self, mock_config):
         """Test saving results to JSON file."""
         scraper = SiteScraper(mock_config)
@@ -366,6 +918,22 @@ class TestSiteScraper:
         assert result_data["company_name"] == "Test Company"
         assert result_data["status"] == "success"
     
+    def test_load_results_json_round_trip(self, mock_config):
+        """Test that saved results load back as equal ScrapingResult objects."""
+        scraper = SiteScraper(mock_config)
+        scraper.results = [ScrapingResult(
+            job_id="test-job", original_url="https://test.com", final_url="https://test.com",
+            domain="test.com", company_name=None, html_path=None, html_size=0,
+            screenshot_path=None, screenshot_hash=None, load_time_ms=30000,
+            viewport_size="1920x1080", redirected=False,
+            ssl_info=SSLInfo(has_ssl=False, is_valid=False, certificate_error="timed out"),
+            bot_protection=BotProtectionInfo(detected=False), status="timeout"
+        )]
+        
+        loaded = SiteScraper.load_results_json(scraper.save_results_json())
+        
+        assert loaded == scraper.results
+    
     def test_load_urls_from_file(self, mock_config):
         """Test loading URLs from file."""
         # Create test file
@@ -386,6 +954,25 @@ class TestSiteScraper:
         expected_urls = ["https://example.com", "https://test.org", "https://final.com"]
         assert loaded_urls == expected_urls
     
+    def test_load_urls_from_file_crlf_and_indentation(self, mock_config):
+        """Test that CRLF endings and surrounding whitespace are stripped."""
+        urls_file = mock_config.output_dir / "crlf_urls.txt"
+        urls_file.write_bytes(b"  https://example.com  \r\n\t# indented comment\r\n\r\nhttps://caf\xc3\xa9.fr\r\n")
+        
+        loaded_urls = SiteScraper.load_urls_from_file(urls_file)
+        
+        assert loaded_urls == ["https://example.com", "https://caf\u00e9.fr"]
+    
+    def test_iter_urls_from_file_streams(self, mock_config):
+        """Test that URLs are yielded lazily from the file."""
+        urls_file = mock_config.output_dir / "stream_urls.txt"
+        urls_file.write_text("https://one.com\n# comment\nhttps://two.com\n")
+        
+        urls = SiteScraper.iter_urls_from_file(urls_file)
+        
+        assert next(urls) == "https://one.com"
+        assert list(urls) == ["https://two.com"]
+    
     def test_load_urls_from_file_not_found(self, mock_config):
         """Test loading URLs from non-existent file."""
         non_existent_file = mock_config.output_dir / "missing.txt"
@@ -406,7 +993,7 @@ class TestSiteScraper:
         # but we can test the URL preprocessing logic by checking what URL 
         # would be passed to SSL checker
         with patch('preprocessing.scraper.SSLChecker.check_certificate') as mock_ssl:
-            with patch('preprocessing.scraper.BotDetector.detect_protection'):
+            with patch('preprocessing.scraper.BotDetector.detect_protection_bytes'):
                 with patch.object(scraper, 'context', None):  # Will cause browser error
                     try:
                         asyncio.run(scraper.scrape_url(test_url))
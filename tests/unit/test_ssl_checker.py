@@ -4,18 +4,26 @@ Unit tests for SSL certificate checking functionality.
 """
 
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 import ssl
-import socket
 from datetime import datetime, timezone
 
-from preprocessing.ssl_checker import SSLChecker
+from preprocessing.ssl_checker import SSLChecker, _parse_cert_date
 from preprocessing.models import SSLInfo
 
 
 class TestSSLChecker:
     """Test cases for the SSLChecker class."""
     
+    @pytest.fixture(autouse=True)
+    def reset_ssl_context(self):
+        """Drop the shared SSL context and cache so each test sees its own patches."""
+        SSLChecker._ssl_context = None
+        SSLChecker.clear_cache()
+        yield
+        SSLChecker._ssl_context = None
+        SSLChecker.clear_cache()
+    
     def test_non_https_url_returns_no_ssl(self):
         """Test that HTTP URLs return has_ssl=False."""
         # This is a synchronous test since it doesn't actually make network calls
@@ -42,9 +50,8 @@ class TestSSLChecker:
         
         asyncio.run(run_test())
     
-    @patch('socket.create_connection')
-    @patch('ssl.create_default_context')
-    def test_successful_certificate_check(self, mock_ssl_context, mock_socket):
+    @patch('asyncio.open_connection', new_callable=AsyncMock)
+    def test_successful_certificate_check(self, mock_open_connection):
         """Test successful SSL certificate retrieval and parsing."""
         import asyncio
         
@@ -63,16 +70,11 @@ class TestSSLChecker:
             'notAfter': 'Jan 15 23:59:59 2026 GMT'  # Certificate expiry format
         }
         
-        # Mock the SSL connection chain
-        mock_ssl_socket = MagicMock()
-        mock_ssl_socket.getpeercert.return_value = mock_cert
-        
-        mock_context_instance = MagicMock()
-        mock_context_instance.wrap_socket.return_value.__enter__.return_value = mock_ssl_socket
-        mock_ssl_context.return_value = mock_context_instance
-        
-        mock_socket_conn = MagicMock()
-        mock_socket.return_value.__enter__.return_value = mock_socket_conn
+        # Mock the TLS stream returned by asyncio.open_connection
+        mock_writer = MagicMock()
+        mock_writer.get_extra_info.return_value = mock_cert
+        mock_writer.wait_closed = AsyncMock()
+        mock_open_connection.return_value = (MagicMock(), mock_writer)
         
         async def run_test():
             result = await SSLChecker.check_certificate("https://example.com")
@@ -80,17 +82,23 @@ class TestSSLChecker:
             # Verify the result
             assert result.has_ssl is True
             assert result.is_valid is True
-            assert result.issuer == "DigiCert Inc"
+            assert result.issuer == "DigiCert SHA2 Secure Server CA"
             assert result.subject == "example.com"
             assert result.expires_date == "2026-01-15T23:59:59+00:00"
             assert result.days_until_expiry is not None
             assert result.certificate_error is None
+            
+            # The connection uses the shared context and is closed afterwards
+            _, kwargs = mock_open_connection.call_args
+            assert kwargs['ssl'] is SSLChecker._get_ssl_context()
+            assert kwargs['server_hostname'] == "example.com"
+            mock_writer.get_extra_info.assert_called_once_with('peercert')
+            mock_writer.close.assert_called_once()
         
         asyncio.run(run_test())
     
-    @patch('socket.create_connection')
-    @patch('ssl.create_default_context') 
-    def test_ssl_error_handling(self, mock_ssl_context, mock_socket):
+    @patch('ssl.create_default_context')
+    def test_ssl_error_handling(self, mock_ssl_context):
         """Test SSL error handling."""
         import asyncio
         
@@ -107,13 +115,26 @@ class TestSSLChecker:
         
         asyncio.run(run_test())
     
-    @patch('socket.create_connection')
-    def test_connection_timeout(self, mock_socket):
+    @patch('ssl.create_default_context')
+    def test_ssl_context_is_shared(self, mock_ssl_context):
+        """Test that the CA bundle is loaded once and strict X.509 checks are off."""
+        mock_ssl_context.return_value = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        mock_ssl_context.return_value.verify_flags |= ssl.VERIFY_X509_STRICT
+        
+        first = SSLChecker._get_ssl_context()
+        second = SSLChecker._get_ssl_context()
+        
+        assert first is second
+        mock_ssl_context.assert_called_once()
+        assert not first.verify_flags & ssl.VERIFY_X509_STRICT
+    
+    @patch('asyncio.open_connection', new_callable=AsyncMock)
+    def test_connection_timeout(self, mock_open_connection):
         """Test connection timeout handling."""
         import asyncio
         
         # Mock connection timeout
-        mock_socket.side_effect = socket.timeout("Connection timed out")
+        mock_open_connection.side_effect = asyncio.TimeoutError("Connection timed out")
         
         async def run_test():
             result = await SSLChecker.check_certificate("https://timeout.example.com")
@@ -124,6 +145,73 @@ class TestSSLChecker:
         
         asyncio.run(run_test())
     
+    @patch('asyncio.open_connection', new_callable=AsyncMock)
+    def test_certificate_cached_per_host(self, mock_open_connection):
+        """Test that concurrent and repeated checks of one host share a handshake."""
+        import asyncio
+        
+        mock_writer = MagicMock()
+        mock_writer.get_extra_info.return_value = {
+            'subject': [[('commonName', 'example.com')]],
+            'issuer': [[('organizationName', 'Test CA')]],
+            'notAfter': 'Jan 15 23:59:59 2030 GMT'
+        }
+        mock_writer.wait_closed = AsyncMock()
+        mock_open_connection.return_value = (MagicMock(), mock_writer)
+        
+        async def run_test():
+            first, second = await asyncio.gather(
+                SSLChecker.check_certificate("https://example.com/a"),
+                SSLChecker.check_certificate("https://example.com/b"),
+            )
+            third = await SSLChecker.check_certificate("https://example.com/c")
+            other_port = await SSLChecker.check_certificate("https://example.com:8443/")
+            
+            assert first.issuer == second.issuer == third.issuer == "Test CA"
+            assert other_port.is_valid is True
+            assert mock_open_connection.call_count == 2
+        
+        asyncio.run(run_test())
+    
+    @patch('asyncio.open_connection', new_callable=AsyncMock)
+    def test_timeout_not_cached(self, mock_open_connection):
+        """Test that transient failures are retried on the next check."""
+        import asyncio
+        
+        mock_open_connection.side_effect = asyncio.TimeoutError("Connection timed out")
+        
+        async def run_test():
+            await SSLChecker.check_certificate("https://slow.example.com")
+            await SSLChecker.check_certificate("https://slow.example.com")
+            assert mock_open_connection.call_count == 2
+        
+        asyncio.run(run_test())
+    
+    def test_parse_cert_date(self):
+        """Test the fixed-width certificate date parser and its fallback."""
+        assert _parse_cert_date('Jan  5 09:08:07 2026 GMT') == datetime(2026, 1, 5, 9, 8, 7, tzinfo=timezone.utc)
+        assert _parse_cert_date('Dec 31 23:59:59 2030 GMT') == datetime(2030, 12, 31, 23, 59, 59, tzinfo=timezone.utc)
+        assert _parse_cert_date('Mar 10 12:00:00 2027 UTC') == datetime(2027, 3, 10, 12, 0, 0, tzinfo=timezone.utc)
+        
+        with pytest.raises(ValueError):
+            _parse_cert_date('Foo 31 23:59:59 2030 GMT')
+        with pytest.raises(ValueError):
+            _parse_cert_date('not a date')
+    
+    def test_security_details_validity_from_dates(self):
+        """Test that browser certificate details are only valid within validFrom/validTo."""
+        details = {"issuer": "R3", "subjectName": "example.com",
+                   "validFrom": 1700000000, "validTo": 4102444800}
+        
+        current = SSLChecker.from_security_details(details)
+        expired = SSLChecker.from_security_details({**details, "validTo": 1700000001})
+        future = SSLChecker.from_security_details({**details, "validFrom": 4102444700})
+        
+        assert current.is_valid is True and current.certificate_error is None
+        assert expired.is_valid is False and expired.certificate_error == "Certificate expired"
+        assert expired.days_until_expiry < 0
+        assert future.is_valid is False and future.certificate_error == "Certificate not yet valid"
+    
     def test_certificate_expiry_soon(self):
         """Test certificate expiring soon detection."""
         # Test with certificate expiring in 20 days